@@ -0,0 +1,180 @@
+"""
+Validation and analysis of whole level packs, distributed over the CPU cores.
+
+Every level is checked for:
+    - player: exactly one mover
+    - boxes:  as many boxes as goals, and at least one goal
+    - walls:  the mover cannot leave the level (the walls around it are closed)
+    - reach:  every box off goal and every free goal is in the region of the mover
+              (boxes ignored)
+    - dead:   no box off goal is already in a deadlock (dead square, 2x2 block or frozen)
+
+The levels are sent to the worker processes by chunks, every worker reads its
+levels from the binary cache of their pack (packfile.py). One JSON line is
+written per level, in the order of the packs:
+    {"pack": "builtin", "level": 3, "title": null, "valid": true, "width": 19, "height": 11,
+     "boxes": 6, "goals": 6, "floor": 57, "problems": {}}
+"problems" maps every failed check to its description, "floor" is the number of
+cells of the region of the mover. The totals are printed on the standard error.
+
+Usage:
+    python3 analyze.py                                  # built-in levels and levels.txt
+    python3 analyze.py --pack pack.slc --no-builtin --output report.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board
+import deadlock
+import levels
+import solver
+
+BUILTIN = "builtin"
+CHECKS = ("player", "boxes", "walls", "reach", "dead")
+CHUNK_SIZE = 128
+
+
+def pack_levels(pack: str):
+    return levels.builtin_levels() if pack == BUILTIN else levels.open_pack(pack)
+
+
+"""
+    Rows of the level surrounded by a ring of floor (the outside, where the short
+    rows are padded too) and a ring of walls: the mover reaches the outside
+    (cell (1, 1)) if the level is open.
+"""
+def framed_rows(rows: list) -> list:
+    rows = [row if isinstance(row, str) else "".join(row) for row in rows]
+    width = max(map(len, rows), default=0)
+    framed = ["#" * (width + 4), "#" + " " * (width + 2) + "#"]
+    framed.extend("# " + row.ljust(width) + " #" for row in rows)
+    framed.extend(("#" + " " * (width + 2) + "#", "#" * (width + 4)))
+    return framed
+
+
+"""
+    Checks the level #rows and returns its report (without its pack and index).
+"""
+def analyze_level(rows: list) -> dict:
+    framed = framed_rows(rows)
+    board = Board.from_xsb(framed)
+    width = board.width - 4
+    report = {"width": width, "height": board.height - 4, "boxes": len(board.boxes), "goals": len(board.goals),
+              "floor": 0}
+    problems = {}
+    players = sum(row.count("@") + row.count("+") for row in framed)
+    if players != 1:
+        problems["player"] = str(players) + " movers instead of 1"
+    if len(board.boxes) != len(board.goals):
+        problems["boxes"] = str(len(board.boxes)) + " boxes for " + str(len(board.goals)) + " goals"
+    elif not board.goals:
+        problems["boxes"] = "no goal"
+    if board.player >= 0:
+        seen, region = solver.reachable(board.cells, board.offsets, (), board.player)
+        if seen[board.width + 1]:
+            problems["walls"] = "the mover can leave the level"
+        else:
+            report["floor"] = seen.count(1)
+            # a box walled in on its goal never has to move
+            boxes = sum(1 for box in board.boxes - board.goals if not seen[box])
+            goals = sum(1 for goal in board.goals - board.boxes if not seen[goal])
+            if boxes or goals:
+                problems["reach"] = str(boxes) + " boxes and " + str(goals) + " goals out of reach"
+    if board.goals and "walls" not in problems:
+        dead_squares = deadlock.compute_dead_squares(board)
+        dead = sorted(box for box in board.boxes if deadlock.is_deadlock_after_push(board, box, dead_squares))
+        if dead:
+            problems["dead"] = "dead boxes at " + ", ".join(
+                str((box % board.width - 2, box // board.width - 2)) for box in dead)
+    report["valid"] = not problems
+    report["problems"] = problems
+    return report
+
+
+"""
+    Analyzes the levels #start to #stop (excluded) of #pack in a worker process.
+"""
+def analyze_chunk(pack: str, start: int, stop: int) -> list:
+    pack_file = pack_levels(pack)
+    results = []
+    for index in range(start, stop):
+        if isinstance(pack_file, list):
+            title, rows = None, pack_file[index]
+        else:
+            title, rows = pack_file.entry(index)
+        result = {"pack": pack, "level": index, "title": title}
+        try:
+            result.update(analyze_level(rows))
+        except Exception as error:
+            # e.g. a level without any row
+            result.update({"valid": False, "problems": {"error": str(error)}})
+        results.append(result)
+    return results
+
+
+"""
+    Returns the (pack, start, stop) chunks of the levels to analyze. The packs are
+    opened once here, their binary cache is built before the workers read it.
+"""
+def list_chunks(builtin: bool, packs: list, chunk_size: int = CHUNK_SIZE) -> list:
+    chunks = []
+    for pack in ([BUILTIN] if builtin else []) + packs:
+        count = len(pack_levels(pack))
+        chunks.extend((pack, start, min(start + chunk_size, count)) for start in range(0, count, chunk_size))
+    return chunks
+
+
+def run(chunks: list, output, workers: int = None) -> dict:
+    # failed: number of levels failing every check ("error" if the level cannot be read)
+    summary = {"levels": 0, "valid": 0, "boxes": 0, "floor": 0, "failed": dict.fromkeys(CHECKS + ("error",), 0)}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # in the order of the chunks, whatever the order they are finished in
+        for results in executor.map(analyze_chunk, *zip(*chunks)):
+            for result in results:
+                summary["levels"] += 1
+                summary["valid"] += result["valid"]
+                summary["boxes"] += result.get("boxes", 0)
+                summary["floor"] += result.get("floor", 0)
+                for check in result["problems"]:
+                    summary["failed"][check] += 1
+                output.write(json.dumps(result) + "\n")
+    return summary
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Check level packs in parallel, one JSON line per level.")
+    parser.add_argument("--pack", action="append", default=None, help="text or SLC pack to check (repeatable, default: levels.txt)")
+    parser.add_argument("--no-builtin", action="store_true", help="do not check the built-in levels")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--output", help="JSONL file (default: standard output)")
+    args = parser.parse_args(argv)
+    packs = args.pack if args.pack is not None else [levels.LEVELS_FILE]
+    start = time.perf_counter()
+    chunks = list_chunks(not args.no_builtin, packs)
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        summary = run(chunks, output, args.workers) if chunks else None
+    finally:
+        if args.output:
+            output.close()
+    elapsed = time.perf_counter() - start
+    if summary is None:
+        print("no level", file=sys.stderr)
+        return
+    levels_count = summary["levels"]
+    print("valid " + str(summary["valid"]) + "/" + str(levels_count) + " in " + str(round(elapsed, 3)) + " s",
+          file=sys.stderr)
+    print("failed checks: " + ", ".join(check + " " + str(count) for check, count in summary["failed"].items()),
+          file=sys.stderr)
+    print("average boxes " + str(round(summary["boxes"] / levels_count, 1)) + ", average floor "
+          + str(round(summary["floor"] / levels_count, 1)) + " cells", file=sys.stderr)
+    if summary["valid"] != levels_count:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
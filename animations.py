@@ -0,0 +1,108 @@
+"""
+Scheduler of the animations of a level.
+
+Every animation of the canvas (box on a goal, deadlock warning, impossible push)
+is owned by one AnimationScheduler: they are all advanced by a single Tk `after`
+timer, armed only while an animation is running. An animation has a key: a new
+animation with the key of a running one replaces it (pushing the same box twice
+does not draw two rings), and at most #max_active animations run at once, the
+oldest one being cancelled first. The number of pending timers is thus 0 or 1,
+and the number of canvas items of the animations at most #max_active.
+"""
+from collections import OrderedDict
+
+# milliseconds between two steps of the animations
+TICK_MS = 50
+MAX_ACTIVE = 8
+
+
+"""
+RingAnimation: a ring shrinking towards the center of a tile, one canvas item
+    moved at every step and deleted at the end.
+"""
+class RingAnimation(object):
+    def __init__(self, x: int, y: int, size: int, color: str, tag: str, steps: int = 3) -> None:
+        # top left corner of the tile, in pixels
+        self.x = x
+        self.y = y
+        self.size = size
+        self.color = color
+        self.tag = tag
+        self.count = steps
+        self.id = None
+
+    def ring(self) -> tuple:
+        inset = self.count * 2
+        return (self.x + self.size - inset, self.y + self.size - inset, self.x + inset, self.y + inset)
+
+    """
+        Draws the next step, returns False when the animation is over.
+    """
+    def step(self, canvas) -> bool:
+        if self.count <= 0:
+            self.cancel(canvas)
+            return False
+        if self.id is None:
+            self.id = canvas.create_oval(*self.ring(), outline=self.color, width=4, tag=self.tag)
+        else:
+            canvas.coords(self.id, *self.ring())
+        self.count -= 1
+        return True
+
+    def cancel(self, canvas) -> None:
+        if self.id is not None:
+            canvas.delete(self.id)
+            self.id = None
+
+
+class AnimationScheduler(object):
+    def __init__(self, canvas, interval: int = TICK_MS, max_active: int = MAX_ACTIVE) -> None:
+        self.canvas = canvas
+        self.interval = interval
+        self.max_active = max_active
+        self.active = OrderedDict()
+        self.timer = None
+        # instrumentation: animations replaced or cancelled before their end
+        self.cancelled = 0
+
+    """
+        Starts #animation under #key, replacing the running animation with the same key.
+        The first step is drawn at once.
+    """
+    def start(self, key, animation) -> None:
+        previous = self.active.pop(key, None)
+        if previous is not None:
+            self.cancel_animation(previous)
+        while len(self.active) >= self.max_active:
+            self.cancel_animation(self.active.popitem(last=False)[1])
+        if not animation.step(self.canvas):
+            return
+        self.active[key] = animation
+        if self.timer is None:
+            self.timer = self.canvas.after(self.interval, self.tick)
+
+    def tick(self) -> None:
+        self.timer = None
+        for key, animation in list(self.active.items()):
+            if not animation.step(self.canvas):
+                del self.active[key]
+        if self.active:
+            self.timer = self.canvas.after(self.interval, self.tick)
+
+    def cancel_animation(self, animation) -> None:
+        animation.cancel(self.canvas)
+        self.cancelled += 1
+
+    def cancel_all(self) -> None:
+        for animation in self.active.values():
+            self.cancel_animation(animation)
+        self.active.clear()
+        if self.timer is not None:
+            self.canvas.after_cancel(self.timer)
+            self.timer = None
+
+    def pending_timers(self) -> int:
+        return 0 if self.timer is None else 1
+
+    def active_count(self) -> int:
+        return len(self.active)
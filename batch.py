@@ -0,0 +1,178 @@
+"""
+Batch solving of whole level packs, distributed over the CPU cores.
+
+Every level is solved by a worker process with its own time and memory budget,
+one JSON line is written as soon as a level is finished:
+    {"pack": "builtin", "level": 3, "solved": true, "status": "solved",
+     "pushes": 14, "moves": 41, "nodes": 47, "seconds": 0.01}
+
+Usage:
+    python3 batch.py                                    # built-in levels and levels.txt
+    python3 batch.py --pack levels.txt --no-builtin --time-limit 30 --memory-mb 512
+    python3 batch.py --workers 4 --output results.jsonl
+"""
+import argparse
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+from collections import deque
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows: no memory budget
+    resource = None
+
+from board import Board, InvalidLevel
+import levels
+import solver
+
+BUILTIN = "builtin"
+# seconds a level may run beyond its time limit before its process is killed
+KILL_MARGIN = 5.0
+
+
+"""
+    Setup of the worker process of a level. The memory budget of a level is checked
+    by the solver, the address space of the worker is also limited to twice
+    #memory_mb in case a single allocation goes far beyond it.
+"""
+def init_worker(memory_mb: int) -> None:
+    if memory_mb and resource is not None:
+        limit = 2 * memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+"""
+    Solves the level #index of #pack in a worker process and returns its result line.
+"""
+def solve_task(pack: str, index: int, method: str, time_limit: float, max_nodes: int, memory_mb: int) -> dict:
+    result = {"pack": pack, "level": index}
+    path = None if pack == BUILTIN else pack
+    try:
+        board = Board.from_xsb(levels.load_level(index, path), validate=True)
+    except InvalidLevel as error:
+        # a broken level of a pack is not given to the solver
+        return failed_task(pack, index, "invalid: " + str(error))
+    max_memory = memory_mb * 1024 * 1024 if memory_mb else None
+    search = solver.solve_board(board, method, max_nodes, time_limit, (pack, index), max_memory)
+    result.update({"solved": search.solved, "status": search.status, "pushes": search.pushes,
+                   "moves": search.moves, "nodes": search.nodes, "seconds": round(search.seconds, 3)})
+    return result
+
+
+"""
+    Returns the (pack, index) of every level to solve.
+"""
+def list_tasks(builtin: bool, packs: list) -> list:
+    tasks = []
+    if builtin:
+        tasks.extend((BUILTIN, index) for index in range(levels.level_count()))
+    for pack in packs:
+        tasks.extend((pack, index) for index in range(levels.level_count(pack)))
+    return tasks
+
+
+"""
+    Worker process of one level: sends the result line of the level on #connection.
+"""
+def run_task(connection, pack: str, index: int, method: str, time_limit: float, max_nodes: int, memory_mb: int) -> None:
+    init_worker(memory_mb)
+    try:
+        result = solve_task(pack, index, method, time_limit, max_nodes, memory_mb)
+    except Exception as error:
+        # e.g. the hard memory limit of the worker reached
+        result = failed_task(pack, index, "error: " + str(error))
+    connection.send(result)
+    connection.close()
+
+
+def failed_task(pack: str, index: int, status: str, seconds: float = None) -> dict:
+    return {"pack": pack, "level": index, "solved": False, "status": status, "pushes": 0, "moves": 0, "nodes": None,
+            "seconds": seconds}
+
+
+"""
+    Solves the levels #tasks, one process per level and at most #workers at a
+    time: the memory measured by the solver is the one of this level only, and a
+    process still running KILL_MARGIN seconds after its time limit is killed
+    (status "time").
+"""
+def run(tasks: list, output, workers: int = None, method: str = "astar", time_limit: float = None,
+        max_nodes: int = None, memory_mb: int = None) -> dict:
+    summary = {"levels": len(tasks), "solved": 0}
+    workers = workers or os.cpu_count() or 1
+    tasks = deque(tasks)
+    # receiving end of the pipe of every running level -> (process, pack, index, start)
+    running = {}
+
+    def finish(result):
+        summary["solved"] += result["solved"]
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+
+    while tasks or running:
+        while tasks and len(running) < workers:
+            pack, index = tasks.popleft()
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=run_task, args=(sender, pack, index, method, time_limit, max_nodes,
+                                                                     memory_mb), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (process, pack, index, time.monotonic())
+        timeout = None
+        if time_limit is not None:
+            oldest = min(start for process, pack, index, start in running.values())
+            timeout = max(0.0, oldest + time_limit + KILL_MARGIN - time.monotonic())
+        for receiver in multiprocessing.connection.wait(list(running), timeout):
+            process, pack, index, start = running.pop(receiver)
+            try:
+                result = receiver.recv()
+            except EOFError:
+                # the process died without an answer (killed by the system, ...)
+                result = None
+            receiver.close()
+            process.join()
+            if result is None:
+                result = failed_task(pack, index, "error: exit code " + str(process.exitcode))
+            finish(result)
+        if time_limit is None:
+            continue
+        now = time.monotonic()
+        for receiver, (process, pack, index, start) in list(running.items()):
+            if now - start > time_limit + KILL_MARGIN and not receiver.poll():
+                process.kill()
+                process.join()
+                receiver.close()
+                del running[receiver]
+                finish(failed_task(pack, index, "time", round(now - start, 3)))
+    return summary
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Solve level packs in parallel, one JSON line per level.")
+    parser.add_argument("--pack", action="append", default=None, help="text pack to solve (repeatable, default: levels.txt)")
+    parser.add_argument("--no-builtin", action="store_true", help="do not solve the built-in levels")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--method", choices=("astar", "idastar"), default="astar")
+    parser.add_argument("--time-limit", type=float, default=60.0, help="seconds per level")
+    parser.add_argument("--max-nodes", type=int, help="expanded nodes per level")
+    parser.add_argument("--memory-mb", type=int, default=1024, help="memory of a worker process")
+    parser.add_argument("--output", help="JSONL file (default: standard output)")
+    args = parser.parse_args(argv)
+    packs = args.pack if args.pack is not None else [levels.LEVELS_FILE]
+    tasks = list_tasks(not args.no_builtin, packs)
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        summary = run(tasks, output, args.workers, args.method, args.time_limit, args.max_nodes, args.memory_mb)
+    finally:
+        if args.output:
+            output.close()
+    print("solved " + str(summary["solved"]) + "/" + str(summary["levels"]), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Benchmarks of the game.
+
+Usage:
+    python3 benchmarks.py deadlock      # deadlock checks per second over the built-in levels
+    python3 benchmarks.py heuristic     # assignment heuristic evaluations per second (incremental and full)
+    python3 benchmarks.py canvas        # live canvas items over a 10,000 moves replay (needs a display)
+    python3 benchmarks.py startup       # cold start of the game and of the tools, in milliseconds
+    python3 benchmarks.py parse         # XSB levels parsed (and validated) per second
+
+Every benchmark plays random moves (fixed seed) on the built-in levels of
+sokobanXSBLevels and times the operation under test on the states reached.
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+
+from board import Board, PUSHED
+import deadlock
+import distances
+from heuristic import AssignmentHeuristic
+import levels
+
+
+"""
+    Plays #moves random moves on #board and yields the index of every box pushed.
+"""
+def random_pushes(board: Board, moves: int, rng: random.Random):
+    for _ in range(moves):
+        direction = rng.randrange(4)
+        if board.move(direction) == PUSHED:
+            yield board.player + board.offsets[direction]
+
+
+def bench_deadlock(moves: int, seed: int) -> None:
+    rng = random.Random(seed)
+    checks = 0
+    deadlocks = 0
+    elapsed = 0.0
+    for level in levels.builtin_levels():
+        board = Board.from_xsb(level)
+        dead_squares = deadlock.compute_dead_squares(board)
+        for box in random_pushes(board, moves, rng):
+            start = time.perf_counter()
+            found = deadlock.is_deadlock_after_push(board, box, dead_squares)
+            elapsed += time.perf_counter() - start
+            checks += 1
+            deadlocks += found
+    print("deadlock checks: " + str(checks) + " (" + str(deadlocks) + " deadlocks)")
+    if elapsed:
+        print("checks per second: " + str(int(checks / elapsed)))
+
+
+def bench_heuristic(moves: int, seed: int) -> None:
+    rng = random.Random(seed)
+    evaluations = 0
+    incremental_elapsed = 0.0
+    full_elapsed = 0.0
+    for level in levels.builtin_levels():
+        board = Board.from_xsb(level)
+        heuristic = AssignmentHeuristic(distances.compute_push_distances(board))
+        assignment = heuristic.initial(board.boxes)
+        for box in random_pushes(board, moves, rng):
+            # after a push, the mover stands on the previous cell of the box
+            start = time.perf_counter()
+            assignment = heuristic.moved(assignment, board.player, box)
+            incremental_elapsed += time.perf_counter() - start
+            start = time.perf_counter()
+            full = heuristic.initial(board.boxes)
+            full_elapsed += time.perf_counter() - start
+            if full.value != assignment.value:
+                raise AssertionError("incremental and full assignments differ")
+            evaluations += 1
+    print("heuristic evaluations: " + str(evaluations))
+    if evaluations:
+        print("incremental evaluations per second: " + str(int(evaluations / incremental_elapsed)))
+        print("full evaluations per second: " + str(int(evaluations / full_elapsed)))
+
+
+"""
+    Loads the classes of the game (sokoban.py) without starting it.
+"""
+def load_game():
+    import sokoban
+    return sokoban
+
+
+"""
+    Processes the events of #root until no animation is pending.
+"""
+def settle(root) -> None:
+    while root.tk.call("after", "info"):
+        root.update()
+        time.sleep(0.01)
+    root.update()
+
+
+def bench_canvas(moves: int, seed: int, level_num: int) -> None:
+    import tkinter as tk
+    game = load_game()
+    rng = random.Random(seed)
+    root = tk.Tk()
+    canvas = tk.Canvas(root)
+    canvas.pack()
+    plan = game.WharehousePlan.from_xsb_matrix(levels.builtin_level(level_num), canvas, level_num)
+    mover = plan.get_mover()
+    settle(root)
+    initial = plan.live_canvas_items()
+    directions = list(game.Direction)
+    start = time.perf_counter()
+    peak_timers = 0
+    for _ in range(moves):
+        mover.move_towards(rng.choice(directions))
+        peak_timers = max(peak_timers, len(root.tk.splitlist(root.tk.call("after", "info"))))
+    plan.render()
+    elapsed = time.perf_counter() - start
+    settle(root)
+    final = plan.live_canvas_items()
+    root.destroy()
+    print("live canvas items: " + str(initial) + " before, " + str(final) + " after " + str(moves) + " moves")
+    print("moves per second: " + str(int(moves / elapsed)))
+    print("pending timers: " + str(peak_timers) + " at most, " + str(plan.animations.cancelled) + " animations superseded")
+    if final != initial:
+        raise AssertionError("canvas items leaked: " + str(final - initial))
+
+
+def bench_parse(repeat: int) -> None:
+    rows = [levels.builtin_level(index) for index in range(len(levels.builtin_levels()))]
+    rows += [level for title, level in levels.read_level_file(levels.LEVELS_FILE)]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for level in rows:
+            Board.from_xsb(level, validate=True)
+    elapsed = time.perf_counter() - start
+    print("levels parsed per second: " + str(int(repeat * len(rows) / elapsed)) + " (" + str(len(rows)) + " levels)")
+
+
+# name -> (Python code run in a new interpreter, module whose import is measured)
+STARTUP_COMMANDS = (
+    ("interpreter", "pass", None),
+    ("game import", "import sokoban", "sokoban"),
+    ("solver import", "import solver", "solver"),
+    ("replay import", "import replay", "replay"),
+    ("first built-in level", "import levels; levels.load_level(0)", "levels"),
+)
+
+
+"""
+    Import time (microseconds) of #module in the output of python -X importtime.
+"""
+def import_time(report: str, module: str) -> int:
+    for line in report.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module and fields[2].startswith(" " + module):
+            return int(fields[1])
+    return 0
+
+
+"""
+    Runs every command of STARTUP_COMMANDS #runs times in a new interpreter (caches
+    of the levels already built) and prints the best wall time and import time.
+"""
+def bench_startup(runs: int) -> None:
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name, code, module in STARTUP_COMMANDS:
+        walls = []
+        imports = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=directory,
+                                     stderr=subprocess.PIPE, text=True, check=True)
+            walls.append(time.perf_counter() - start)
+            if module is not None:
+                imports.append(import_time(process.stderr, module))
+        line = name + ": " + str(round(min(walls) * 1000, 1)) + " ms"
+        if imports:
+            line += " (import " + str(round(min(imports) / 1000, 1)) + " ms)"
+        print(line)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks of the Sokoban game.")
+    parser.add_argument("--seed", type=int, default=0)
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    parser_deadlock = subparsers.add_parser("deadlock", help="deadlock checks per second")
+    parser_deadlock.add_argument("--moves", type=int, default=10000, help="random moves per level")
+    parser_heuristic = subparsers.add_parser("heuristic", help="assignment heuristic evaluations per second")
+    parser_heuristic.add_argument("--moves", type=int, default=10000, help="random moves per level")
+    parser_canvas = subparsers.add_parser("canvas", help="live canvas items over a replay (needs a display)")
+    parser_canvas.add_argument("--moves", type=int, default=10000, help="random moves played")
+    parser_canvas.add_argument("--level", type=int, default=0, help="built-in level")
+    parser_startup = subparsers.add_parser("startup", help="cold start times (python -X importtime)")
+    parser_startup.add_argument("--runs", type=int, default=5, help="runs of every command, the best one is kept")
+    parser_parse = subparsers.add_parser("parse", help="XSB levels parsed per second")
+    parser_parse.add_argument("--repeat", type=int, default=20, help="parses of every level")
+    args = parser.parse_args(argv)
+    if args.benchmark == "deadlock":
+        bench_deadlock(args.moves, args.seed)
+    elif args.benchmark == "heuristic":
+        bench_heuristic(args.moves, args.seed)
+    elif args.benchmark == "canvas":
+        bench_canvas(args.moves, args.seed, args.level)
+    elif args.benchmark == "startup":
+        bench_startup(args.runs)
+    elif args.benchmark == "parse":
+        bench_parse(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Headless board core of the Sokoban game.
+
+The board does not depend on tkinter: it can be built and played on a server
+without display (solver, batch tools, replays). The game (Level, Mover, ...)
+only renders it.
+
+Representation:
+    - cells: flat bytearray of cell codes (FLOOR, WALL, GOAL), the cell (x, y)
+      is stored at the index y * width + x
+    - boxes: set of the indices of the cells holding a box
+    - player: index of the cell of the mover
+    - uncovered: number of goals without a box, updated by every push,
+      the level is won when it reaches 0
+
+Parsing (from_xsb): the rows of the level are padded to the same width and joined,
+the cell codes are then computed for all the cells at once by bytes.translate, the
+boxes and the mover are found by regular expressions. With #validate, a level without
+exactly one mover, or without as many boxes as goals, or whose walls do not enclose
+the mover, raises an InvalidLevel error.
+
+The identity of a state is given by its Zobrist hash (see zobrist.py): the hash
+of the boxes (#box_hash) is updated in O(1) by every push, the mover is added
+by #state_hash.
+"""
+import re
+
+import zobrist
+
+FLOOR = 0
+WALL = 1
+GOAL = 2
+
+# Directions, in the same order as the Direction enum of the game
+UP = 0
+DOWN = 1
+LEFT = 2
+RIGHT = 3
+
+# LURD notation: lower case for a move, upper case for a push
+MOVE_CHARS = "udlr"
+PUSH_CHARS = "UDLR"
+
+# XSB character -> cell code ('#' wall, '.' '*' '+' goal, anything else floor),
+# PADDING (end of the short rows) is a wall
+PADDING = "\0"
+CELL_TABLE = bytearray([FLOOR]) * 256
+CELL_TABLE[ord('#')] = WALL
+CELL_TABLE[ord(PADDING)] = WALL
+for goal_char in ".*+":
+    CELL_TABLE[ord(goal_char)] = GOAL
+CELL_TABLE = bytes(CELL_TABLE)
+BOX_PATTERN = re.compile(rb"[$*]")
+PLAYER_PATTERN = re.compile(rb"[@+]")
+GOAL_PATTERN = re.compile(bytes([GOAL]))
+
+
+class InvalidLevel(ValueError):
+    pass
+
+
+"""
+    Returns True if the mover on #start cannot leave the level of the XSB bytes
+    #data (rows padded to #width): the cells it reaches, boxes ignored, are neither
+    on the border of the grid nor next to the end of a short row.
+"""
+def is_closed(data: bytes, width: int, start: int) -> bool:
+    size = len(data)
+    wall = ord('#')
+    padding = ord(PADDING)
+    seen = bytearray(size)
+    seen[start] = 1
+    stack = [start]
+    while stack:
+        index = stack.pop()
+        x = index % width
+        if x == 0 or x == width - 1 or index < width or index >= size - width:
+            return False
+        for neighbour in (index - width, index + width, index - 1, index + 1):
+            c = data[neighbour]
+            if c == padding:
+                return False
+            if c != wall and not seen[neighbour]:
+                seen[neighbour] = 1
+                stack.append(neighbour)
+    return True
+
+
+# Results of Board.move
+BLOCKED = 0
+MOVED = 1
+PUSHED = 2
+
+
+class Board(object):
+    __slots__ = ("width", "height", "cells", "goals", "boxes", "player", "offsets", "keys", "box_hash", "uncovered")
+
+    def __init__(self, width: int, height: int, cells: bytearray, boxes: set, player: int) -> None:
+        self.width: int = width
+        self.height: int = height
+        # the static layer is never modified once the board is built,
+        # it can be shared between copies of the board
+        self.cells: bytearray = cells
+        self.goals: frozenset = frozenset(match.start() for match in GOAL_PATTERN.finditer(cells))
+        self.boxes: set = boxes
+        self.player: int = player
+        self.uncovered: int = len(self.goals - boxes)
+        # index offset of each direction (UP, DOWN, LEFT, RIGHT)
+        self.offsets: tuple = (-width, width, -1, 1)
+        self.keys: zobrist.ZobristKeys = zobrist.keys_for(len(cells))
+        self.box_hash: int = self.keys.boxes_hash(boxes)
+
+    # legend:
+    #   '#' = wall,  '$' = box, '.' = goal, '*' = box on goal, '@' = mover, '+' = mover on goal, '-' = floor, ' ' = floor
+    # The cells after the end of a short line are considered as walls.
+    # The rows are strings or lists of characters. Without #validate, the last mover
+    # found is kept (-1 if none).
+    @classmethod
+    def from_xsb(cls, xsb_matrix, validate: bool = False) -> "Board":
+        rows = [row if isinstance(row, str) else "".join(row) for row in xsb_matrix]
+        height = len(rows)
+        width = max(map(len, rows), default=0)
+        # non ASCII characters are floor, as any unknown character
+        data = "".join([row.ljust(width, PADDING) for row in rows]).encode("ascii", "replace")
+        cells = bytearray(data.translate(CELL_TABLE))
+        boxes = {match.start() for match in BOX_PATTERN.finditer(data)}
+        players = [match.start() for match in PLAYER_PATTERN.finditer(data)]
+        if validate:
+            goals = cells.count(GOAL)
+            if len(players) != 1:
+                raise InvalidLevel(str(len(players)) + " movers instead of 1")
+            if len(boxes) != goals:
+                raise InvalidLevel(str(len(boxes)) + " boxes for " + str(goals) + " goals")
+            if goals == 0:
+                raise InvalidLevel("no goal")
+            if not is_closed(data, width, players[0]):
+                raise InvalidLevel("the mover can leave the level")
+        return cls(width, height, cells, boxes, players[-1] if players else -1)
+
+    def to_xsb(self) -> list:
+        lines = []
+        for y in range(self.height):
+            line = []
+            for index in range(y * self.width, (y + 1) * self.width):
+                cell = self.cells[index]
+                if cell == WALL:
+                    line.append('#')
+                elif index == self.player:
+                    line.append('+' if cell == GOAL else '@')
+                elif index in self.boxes:
+                    line.append('*' if cell == GOAL else '$')
+                else:
+                    line.append('.' if cell == GOAL else '-')
+            lines.append(''.join(line))
+        return lines
+
+    def copy(self) -> "Board":
+        board = Board.__new__(Board)
+        board.width = self.width
+        board.height = self.height
+        board.cells = self.cells
+        board.goals = self.goals
+        board.boxes = set(self.boxes)
+        board.player = self.player
+        board.offsets = self.offsets
+        board.keys = self.keys
+        board.box_hash = self.box_hash
+        board.uncovered = self.uncovered
+        return board
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def coordinates(self, index: int) -> tuple:
+        return index % self.width, index // self.width
+
+    def is_wall(self, index: int) -> bool:
+        return self.cells[index] == WALL
+
+    def is_goal(self, index: int) -> bool:
+        return self.cells[index] == GOAL
+
+    def has_box(self, index: int) -> bool:
+        return index in self.boxes
+
+    """
+        Returns True if the mover can move in the direction #direction.
+        As in the game, the calculation requires seeing the adjacent cell but also the next one (offset of 2).
+    """
+    def can_move(self, direction: int) -> bool:
+        offset = self.offsets[direction]
+        target = self.player + offset
+        if target in self.boxes:
+            beyond = target + offset
+            return self.cells[beyond] != WALL and beyond not in self.boxes
+        return self.cells[target] != WALL
+
+    """
+        Moves the mover in the direction #direction, pushing the adjacent box if any.
+        Returns BLOCKED (nothing changed), MOVED or PUSHED.
+    """
+    def move(self, direction: int) -> int:
+        offset = self.offsets[direction]
+        target = self.player + offset
+        boxes = self.boxes
+        if target in boxes:
+            beyond = target + offset
+            if self.cells[beyond] == WALL or beyond in boxes:
+                return BLOCKED
+            self.move_box(target, beyond)
+            self.player = target
+            return PUSHED
+        if self.cells[target] == WALL:
+            return BLOCKED
+        self.player = target
+        return MOVED
+
+    """
+        Reverts the move in the direction #direction: the mover steps back and,
+        if the move was a push (#pushed), pulls the box back. O(1), used by the undo.
+    """
+    def unmove(self, direction: int, pushed: bool) -> None:
+        offset = self.offsets[direction]
+        if pushed:
+            self.move_box(self.player + offset, self.player)
+        self.player -= offset
+
+    # Moves the box of #source to #target, updating the hash and the uncovered goals
+    def move_box(self, source: int, target: int) -> None:
+        self.boxes.remove(source)
+        self.boxes.add(target)
+        box_keys = self.keys.boxes
+        self.box_hash ^= box_keys[source] ^ box_keys[target]
+        cells = self.cells
+        if cells[source] == GOAL:
+            self.uncovered += 1
+        if cells[target] == GOAL:
+            self.uncovered -= 1
+
+    """
+        64-bit Zobrist hash of the state (boxes and mover).
+        #player replaces the cell of the mover if given, e.g. the normalized
+        position of its reachable region.
+    """
+    def state_hash(self, player: int = None) -> int:
+        if player is None:
+            player = self.player
+        return self.box_hash ^ self.keys.players[player]
+
+    # O(1): the number of uncovered goals is maintained by #move
+    def is_solved(self) -> bool:
+        return self.uncovered == 0
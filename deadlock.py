@@ -0,0 +1,172 @@
+"""
+Deadlock detection for the Sokoban boards.
+
+Dead squares:
+    A box pushed on a dead square can never reach a goal again, the level is then
+    unwinnable. The map of the dead squares only depends on the walls and the goals:
+    it is computed once per level by pulling a box backwards from every goal
+    (a box can be pulled from c to c - offset if the mover can stand on
+    c - 2 * offset), every floor cell not reached is dead.
+    The map is a bytearray indexed like Board.cells, a query is O(1).
+
+Freeze deadlocks:
+    A box is frozen when it can be moved neither horizontally nor vertically,
+    because of walls, dead squares or other frozen boxes (2x2 blocks of boxes and
+    walls, lines of boxes along a wall...). A frozen box which is not on a goal
+    makes the level unwinnable. The check is incremental: it only looks at the
+    box just pushed and, recursively, at the boxes which block it, at most
+    #max_boxes of them, so its cost per push is bounded.
+"""
+from collections import deque
+
+from board import Board, WALL, GOAL
+
+# dead square maps already computed, by level id
+_dead_squares_cache = {}
+
+
+"""
+    Computes the dead square map of the board: 1 for a dead square, 0 otherwise
+    (walls are marked 0, a box can never be there anyway).
+    O(cells): every cell enters the queue at most once.
+"""
+def compute_dead_squares(board: Board) -> bytearray:
+    cells = board.cells
+    size = len(cells)
+    alive = bytearray(size)
+    queue = deque()
+    for goal in board.goals:
+        alive[goal] = 1
+        queue.append(goal)
+    while queue:
+        index = queue.popleft()
+        for offset in board.offsets:
+            previous = index - offset
+            behind = previous - offset
+            if 0 <= behind < size and not alive[previous] and cells[previous] != WALL and cells[behind] != WALL:
+                alive[previous] = 1
+                queue.append(previous)
+    dead = bytearray(size)
+    for index in range(size):
+        if cells[index] != WALL and not alive[index]:
+            dead[index] = 1
+    return dead
+
+
+"""
+    Returns the dead square map of the board, computed once per #level_id
+    (no cache if #level_id is None).
+"""
+def dead_squares(board: Board, level_id=None) -> bytearray:
+    if level_id is None:
+        return compute_dead_squares(board)
+    dead = _dead_squares_cache.get(level_id)
+    if dead is None or len(dead) != len(board.cells):
+        dead = compute_dead_squares(board)
+        _dead_squares_cache[level_id] = dead
+    return dead
+
+
+def clear_cache() -> None:
+    _dead_squares_cache.clear()
+
+
+"""
+    Returns True if the box at #box is part of a 2x2 square of walls and boxes
+    containing a box which is not on a goal. Only the 4 squares containing #box are checked.
+    #boxes replaces the boxes of the board if given (solver states).
+"""
+def is_2x2_deadlock(board: Board, box: int, boxes=None) -> bool:
+    if boxes is None:
+        boxes = board.boxes
+    cells = board.cells
+    width = board.width
+    for corner in (box, box - 1, box - width, box - width - 1):
+        square = (corner, corner + 1, corner + width, corner + width + 1)
+        off_goal = False
+        for index in square:
+            if index < 0 or index >= len(cells):
+                break
+            if index in boxes:
+                if cells[index] != GOAL:
+                    off_goal = True
+            elif cells[index] != WALL:
+                break
+        else:
+            if off_goal:
+                return True
+    return False
+
+
+"""
+    Returns True if the box at #box is frozen and the frozen boxes are not all on goals.
+    Only the neighbourhood of #box is examined, at most #max_boxes recursive box tests
+    (beyond this limit the box is considered not frozen).
+"""
+def is_freeze_deadlock(board: Board, box: int, dead_squares: bytearray = None, boxes=None, max_boxes: int = 32) -> bool:
+    if boxes is None:
+        boxes = board.boxes
+    frozen = []
+    checker = _FreezeChecker(board, dead_squares, boxes, max_boxes, frozen)
+    if not (checker.is_blocked(box, 0) and checker.is_blocked(box, 1)):
+        return False
+    if board.cells[box] != GOAL:
+        return True
+    for index in frozen:
+        if board.cells[index] != GOAL:
+            return True
+    return False
+
+
+"""
+    Complete check after a push of the box now at #box:
+    dead square, 2x2 block or freeze deadlock.
+"""
+def is_deadlock_after_push(board: Board, box: int, dead_squares: bytearray, boxes=None) -> bool:
+    if dead_squares[box]:
+        return True
+    return is_2x2_deadlock(board, box, boxes) or is_freeze_deadlock(board, box, dead_squares, boxes)
+
+
+"""
+_FreezeChecker: recursive freeze test of one push.
+    The boxes being examined (#visited) are considered as walls by the boxes which
+    depend on them, this avoids infinite recursion between two neighbouring boxes.
+"""
+class _FreezeChecker(object):
+    def __init__(self, board: Board, dead_squares: bytearray, boxes, max_boxes: int, frozen: list) -> None:
+        self.cells = board.cells
+        # offsets along the vertical axis (0) and the horizontal axis (1)
+        self.axis_offsets = (board.width, 1)
+        self.dead_squares = dead_squares
+        self.boxes = boxes
+        self.max_boxes = max_boxes
+        self.frozen = frozen
+        self.visited = set()
+        self.examined = 0
+
+    def is_blocked(self, box: int, axis: int) -> bool:
+        cells = self.cells
+        offset = self.axis_offsets[axis]
+        before = box - offset
+        after = box + offset
+        if cells[before] == WALL or cells[after] == WALL:
+            return True
+        dead_squares = self.dead_squares
+        if dead_squares is not None and dead_squares[before] and dead_squares[after]:
+            return True
+        self.examined += 1
+        if self.examined > self.max_boxes:
+            return False
+        self.visited.add(box)
+        try:
+            for side in (before, after):
+                if side in self.boxes:
+                    if side in self.visited:
+                        return True
+                    if self.is_blocked(side, 1 - axis):
+                        self.frozen.append(side)
+                        return True
+            return False
+        finally:
+            self.visited.discard(box)
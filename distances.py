@@ -0,0 +1,237 @@
+"""
+Push distances of a level.
+
+The push distance from a cell c to a goal g is the minimum number of pushes
+needed to bring a box from c to g when it is alone on the board, the mover
+having to stand behind the box for every push. It only depends on the walls and
+the goals of the level.
+
+The distances to every goal are computed by pulling a box backwards from the
+goal: a state is (cell of the box, side of the box where the mover stands), the
+mover can go from one side to another one if they are connected when the box
+is considered as a wall. The distance of a cell is the smallest one of its sides,
+which is a lower bound of the real number of pushes.
+
+The table is a flat array of unsigned 16-bit integers: the distance from the
+cell c to the goal number i (goals sorted by index) is table[i * size + c],
+UNREACHABLE if the goal cannot be reached.
+
+Disk cache:
+    The tables are stored in CACHE_DIR, one binary file per layout named by the
+    hash of the walls and goals of the level (see layout_key):
+        header: magic "SKPD", version (u16), byte order (u16), goals (u32), size (u32)
+        goals:  cell index of every goal (u32)
+        table:  the distances (u16)
+    A cached file is memory mapped: the distances are only read from the disk
+    when they are used, reopening a level or running a new batch does not
+    compute them again.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+
+from board import Board, WALL
+
+UNREACHABLE = 0xFFFF
+
+# SOKOBAN_CACHE_DIR replaces the whole directory: the level packs (packfile.py)
+# are then cached in the same directory (files *.sklp, the distances are *.bin)
+CACHE_DIR = os.environ.get("SOKOBAN_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "distances"))
+MAGIC = b"SKPD"
+VERSION = 2
+HEADER = struct.Struct("<4sHHII")
+BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+
+# tables already loaded in this process, by layout key
+_loaded = {}
+
+
+class PushDistances(object):
+    def __init__(self, goals: list, size: int, table, mapping: mmap.mmap = None) -> None:
+        # goals sorted by cell index
+        self.goals: list = goals
+        self.size: int = size
+        # array('H') or memoryview of unsigned 16-bit integers
+        self.table = table
+        # memory mapped file of the table, kept open as long as the table is used
+        self.mapping = mapping
+
+    def distance(self, cell: int, goal_number: int) -> int:
+        return self.table[goal_number * self.size + cell]
+
+    """
+        Distances from #cell to every goal, in the order of #goals.
+    """
+    def row(self, cell: int) -> list:
+        table = self.table
+        size = self.size
+        return [table[number * size + cell] for number in range(len(self.goals))]
+
+    """
+        Distance from #cell to its nearest goal.
+    """
+    def nearest(self, cell: int) -> int:
+        return min(self.row(cell), default=UNREACHABLE)
+
+
+"""
+    Labels the sides of every cell: sides[4 * cell + direction] is the number of
+    the region of the mover on this side of a box on #cell (0 for a wall).
+    Two sides with the same number are connected without passing through #cell.
+    #check, if given, is called for every cell and may raise to stop the computation.
+"""
+def side_regions(board: Board, check=None) -> array:
+    cells = board.cells
+    offsets = board.offsets
+    size = len(cells)
+    sides = array('i', bytes(4 * 4 * size))
+    mark = array('i', bytes(4 * size))
+    for box in range(size):
+        if cells[box] == WALL:
+            continue
+        if check is not None:
+            check()
+        # marks of this box start at box * 4 + 1, which keeps them distinct from the previous boxes
+        region = box * 4
+        for direction in range(4):
+            start = box + offsets[direction]
+            if not 0 <= start < size or cells[start] == WALL:
+                continue
+            if mark[start] > box * 4:
+                sides[4 * box + direction] = mark[start]
+                continue
+            region += 1
+            mark[start] = region
+            stack = [start]
+            while stack:
+                index = stack.pop()
+                for offset in offsets:
+                    neighbour = index + offset
+                    if 0 <= neighbour < size and neighbour != box and cells[neighbour] != WALL and mark[neighbour] <= box * 4:
+                        mark[neighbour] = region
+                        stack.append(neighbour)
+            sides[4 * box + direction] = region
+    return sides
+
+
+"""
+    Computes the push distances of every cell to every goal of the board.
+    #check, if given, is called regularly and may raise to stop the computation
+    (time limit of the solver: about a second for a level with hundreds of goals).
+"""
+def compute_push_distances(board: Board, check=None) -> PushDistances:
+    cells = board.cells
+    offsets = board.offsets
+    size = len(cells)
+    goals = sorted(board.goals)
+    sides = side_regions(board, check)
+    table = array('H', [UNREACHABLE]) * (len(goals) * size)
+    for number in range(len(goals)):
+        if check is not None:
+            check()
+        base = number * size
+        # distances of the states (box, side of the mover)
+        states = array('H', [UNREACHABLE]) * (4 * size)
+        queue = deque()
+        goal = goals[number]
+        # even walled in: a box already on its goal is at distance 0
+        table[base + goal] = 0
+        for direction in range(4):
+            if sides[4 * goal + direction]:
+                states[4 * goal + direction] = 0
+                queue.append(4 * goal + direction)
+        while queue:
+            state = queue.popleft()
+            box, side = divmod(state, 4)
+            distance = states[state]
+            if distance < table[base + box]:
+                table[base + box] = distance
+            # the mover can walk to the other sides of its region
+            region = sides[state]
+            for other in range(4):
+                if other != side and sides[4 * box + other] == region and states[4 * box + other] > distance:
+                    states[4 * box + other] = distance
+                    queue.appendleft(4 * box + other)
+            # pull: the box goes to the cell of the mover, which steps back
+            previous = box + offsets[side]
+            behind = previous + offsets[side]
+            if 0 <= behind < size and cells[behind] != WALL and states[4 * previous + side] > distance + 1:
+                states[4 * previous + side] = distance + 1
+                queue.append(4 * previous + side)
+    return PushDistances(goals, size, table)
+
+
+"""
+    Hash of the static layer of the board (dimensions, walls and goals):
+    the push distances only depend on it.
+"""
+def layout_key(board: Board) -> str:
+    digest = hashlib.sha1(struct.pack("<II", board.width, board.height))
+    digest.update(bytes(board.cells))
+    return digest.hexdigest()
+
+
+def cache_path(key: str, cache_dir: str = None) -> str:
+    return os.path.join(cache_dir or CACHE_DIR, key + ".bin")
+
+
+"""
+    Writes the table in the cache (atomically: a partially written file is never read).
+"""
+def save_push_distances(distances: PushDistances, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = path + "." + str(os.getpid()) + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER, len(distances.goals), distances.size))
+        f.write(struct.pack("<" + str(len(distances.goals)) + "I", *distances.goals))
+        f.write(array('H', distances.table).tobytes())
+    os.replace(temporary, path)
+
+
+"""
+    Maps the cached table #path, returns None if the file is missing or invalid.
+"""
+def open_push_distances(path: str):
+    try:
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapping) < HEADER.size:
+        mapping.close()
+        return None
+    magic, version, byte_order, goals_count, size = HEADER.unpack_from(mapping, 0)
+    goals_end = HEADER.size + 4 * goals_count
+    if magic != MAGIC or version != VERSION or byte_order != BYTE_ORDER or len(mapping) != goals_end + 2 * goals_count * size:
+        mapping.close()
+        return None
+    goals = list(struct.unpack_from("<" + str(goals_count) + "I", mapping, HEADER.size))
+    table = memoryview(mapping)[goals_end:].cast('H')
+    return PushDistances(goals, size, table, mapping)
+
+
+"""
+    Returns the push distances of the board: from this process if they were
+    already loaded, from the disk cache if the layout was already seen, computed
+    (and cached) otherwise. #check: see compute_push_distances.
+"""
+def push_distances(board: Board, cache_dir: str = None, check=None) -> PushDistances:
+    key = layout_key(board)
+    distances = _loaded.get(key)
+    if distances is not None:
+        return distances
+    path = cache_path(key, cache_dir)
+    distances = open_push_distances(path)
+    if distances is None:
+        distances = compute_push_distances(board, check)
+        try:
+            save_push_distances(distances, path)
+        except OSError:
+            # read-only installation: the table is only kept in memory
+            pass
+    _loaded[key] = distances
+    return distances
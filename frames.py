@@ -0,0 +1,84 @@
+"""
+Input and rendering pace of the game.
+
+The key events are queued (InputQueue) and applied to the state of the game as
+soon as they arrive, the canvas is only updated by the frame clock (FrameClock):
+a single Tk `after` timer, armed when the state changes, which renders at most
+once every FRAME_MS milliseconds. A burst of key repeats is thus applied move by
+move, in order, but drawn once, and the event loop is never blocked by a
+synchronous redraw.
+"""
+import time
+from collections import deque
+
+# about 60 frames per second
+FRAME_MS = 16
+# key events kept while the previous ones are applied, the next ones are dropped
+MAX_PENDING = 32
+
+
+class InputQueue(object):
+    def __init__(self, max_pending: int = MAX_PENDING) -> None:
+        self.pending = deque()
+        self.max_pending = max_pending
+        # instrumentation: events dropped because the queue was full
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    """
+        Queues the event #event, returns False if it is dropped (queue full).
+    """
+    def push(self, event) -> bool:
+        if len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        self.pending.append(event)
+        return True
+
+    """
+        Queues all the events of #events (scripted input, never dropped).
+    """
+    def extend(self, events) -> None:
+        self.pending.extend(events)
+
+    def pop(self):
+        return self.pending.popleft()
+
+
+class FrameClock(object):
+    def __init__(self, widget, callback, interval: int = FRAME_MS) -> None:
+        self.widget = widget
+        self.callback = callback
+        self.interval = interval
+        self.timer = None
+        self.last_frame = 0.0
+        # instrumentation: frames rendered
+        self.frames = 0
+
+    @property
+    def pending(self) -> bool:
+        return self.timer is not None
+
+    """
+        Asks for a frame: the callback is called once, at least #interval
+        milliseconds after the previous frame, whatever the number of requests.
+    """
+    def request(self) -> None:
+        if self.timer is not None:
+            return
+        elapsed = (time.perf_counter() - self.last_frame) * 1000
+        delay = max(0, int(self.interval - elapsed))
+        self.timer = self.widget.after(delay, self.tick)
+
+    def tick(self) -> None:
+        self.timer = None
+        self.last_frame = time.perf_counter()
+        self.frames += 1
+        self.callback()
+
+    def cancel(self) -> None:
+        if self.timer is not None:
+            self.widget.after_cancel(self.timer)
+            self.timer = None
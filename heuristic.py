@@ -0,0 +1,172 @@
+"""
+Assignment lower bound of the number of pushes left.
+
+Every box has to go to a different goal: the minimum cost matching of the
+boxes to the goals, the cost of a pair being the push distance (distances.py),
+is an admissible heuristic, much stronger than the sum of the distances of
+the boxes to their nearest goal.
+
+The matching is computed with the Hungarian algorithm (O(n^3) for n boxes).
+When a single box moves, only the row of this box changes: its assignment is
+removed and the row is added again by one augmentation of the Hungarian
+algorithm, which is O(n^2) as the dual variables of the other rows stay valid.
+The incremental update needs as many boxes as goals (all the goals are matched),
+other levels are recomputed from scratch.
+"""
+from distances import PushDistances, UNREACHABLE
+
+# cost of a box which cannot reach a goal, larger than any sum of real distances
+INFINITE_COST = 1 << 24
+INFINITY = 1 << 30
+
+
+"""
+Assignment: matching of the boxes to the goals of one state.
+    rows[i] is the cell of the box i, costs[i] its distances to the goals,
+    u and v the dual variables (rows and columns, index 0 unused),
+    owner[j] the row matched to the goal j (columns numbered from 1).
+"""
+class Assignment(object):
+    __slots__ = ("rows", "costs", "u", "v", "owner", "value")
+
+    def __init__(self, rows: list, costs: list, u: list, v: list, owner: list, value: int) -> None:
+        self.rows = rows
+        self.costs = costs
+        self.u = u
+        self.v = v
+        self.owner = owner
+        self.value = value
+
+    def copy(self) -> "Assignment":
+        return Assignment(self.rows[:], self.costs[:], self.u[:], self.v[:], self.owner[:], self.value)
+
+
+class AssignmentHeuristic(object):
+    def __init__(self, distances: PushDistances) -> None:
+        self.distances = distances
+        self.goals = len(distances.goals)
+        self.evaluations = 0
+
+    def cost_row(self, cell: int) -> list:
+        return [INFINITE_COST if d == UNREACHABLE else d for d in self.distances.row(cell)]
+
+    """
+        Full computation of the assignment of the boxes #boxes. O(n^3): #check, if
+        given, is called for every box and may raise to stop the computation.
+    """
+    def initial(self, boxes, check=None) -> Assignment:
+        self.evaluations += 1
+        rows = sorted(boxes)
+        costs = [self.cost_row(box) for box in rows]
+        goals = self.goals
+        assignment = Assignment(rows, costs, [0] * (len(rows) + 1), [0] * (goals + 1), [0] * (goals + 1), 0)
+        if len(rows) > goals:
+            # more boxes than goals: at least every goal needs a box
+            assignment.value = self.transposed_value(costs)
+            return assignment
+        for row in range(1, len(rows) + 1):
+            if check is not None:
+                check()
+            add_row(assignment, row, goals)
+        update_value(assignment, goals)
+        return assignment
+
+    """
+        Assignment after the push of the box on #old_cell to #new_cell,
+        computed from the assignment #parent of the previous state (not modified).
+    """
+    def moved(self, parent: Assignment, old_cell: int, new_cell: int) -> Assignment:
+        if len(parent.rows) != self.goals:
+            boxes = set(parent.rows)
+            boxes.remove(old_cell)
+            boxes.add(new_cell)
+            return self.initial(boxes)
+        self.evaluations += 1
+        assignment = parent.copy()
+        row = assignment.rows.index(old_cell) + 1
+        assignment.rows[row - 1] = new_cell
+        assignment.costs[row - 1] = self.cost_row(new_cell)
+        # the row is removed from the matching, its dual variable is reset:
+        # the columns variables are never positive, the reduced costs of the row stay >= 0
+        owner = assignment.owner
+        for column in range(1, self.goals + 1):
+            if owner[column] == row:
+                owner[column] = 0
+                break
+        assignment.u[row] = 0
+        add_row(assignment, row, self.goals)
+        update_value(assignment, self.goals)
+        return assignment
+
+    """
+        Value of the matching of every goal to a different box (more boxes than goals).
+    """
+    def transposed_value(self, costs: list) -> int:
+        goals = self.goals
+        boxes = len(costs)
+        transposed = [[costs[row][goal] for row in range(boxes)] for goal in range(goals)]
+        assignment = Assignment(list(range(goals)), transposed, [0] * (goals + 1), [0] * (boxes + 1), [0] * (boxes + 1), 0)
+        for row in range(1, goals + 1):
+            add_row(assignment, row, boxes)
+        update_value(assignment, boxes)
+        return assignment.value
+
+
+"""
+    One phase of the Hungarian algorithm: matches the row #row to one of the #columns
+    columns, the other matched rows may change of column along the augmenting path. O(n^2).
+"""
+def add_row(assignment: Assignment, row: int, columns: int) -> None:
+    costs = assignment.costs
+    u = assignment.u
+    v = assignment.v
+    owner = assignment.owner
+    minimum = [INFINITY] * (columns + 1)
+    used = [False] * (columns + 1)
+    way = [0] * (columns + 1)
+    owner[0] = row
+    column = 0
+    while True:
+        used[column] = True
+        current_row = owner[column]
+        row_costs = costs[current_row - 1]
+        delta = INFINITY
+        next_column = 0
+        u_row = u[current_row]
+        for j in range(1, columns + 1):
+            if not used[j]:
+                reduced = row_costs[j - 1] - u_row - v[j]
+                if reduced < minimum[j]:
+                    minimum[j] = reduced
+                    way[j] = column
+                if minimum[j] < delta:
+                    delta = minimum[j]
+                    next_column = j
+        for j in range(columns + 1):
+            if used[j]:
+                u[owner[j]] += delta
+                v[j] -= delta
+            else:
+                minimum[j] -= delta
+        column = next_column
+        if owner[column] == 0:
+            break
+    # augmentation along the path
+    while column:
+        previous = way[column]
+        owner[column] = owner[previous]
+        column = previous
+    owner[0] = 0
+
+
+"""
+    Value of the matching: sum of the costs of the matched pairs, INFINITY if a box cannot reach its goal.
+"""
+def update_value(assignment: Assignment, columns: int) -> None:
+    value = 0
+    costs = assignment.costs
+    owner = assignment.owner
+    for column in range(1, columns + 1):
+        if owner[column]:
+            value += costs[owner[column] - 1][column - 1]
+    assignment.value = INFINITY if value >= INFINITE_COST else value
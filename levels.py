@@ -0,0 +1,221 @@
+"""
+Access to the levels of the game without tkinter.
+
+Three sources are supported:
+    - the built-in levels of sokobanXSBLevels.SokobanXSBLevels (101 levels)
+    - text packs such as levels.txt: "Level N" title lines followed by the XSB rows
+      of the level, levels are separated by blank lines
+    - SLC packs (XML): <Level Id="..."> elements holding one <L> element per row
+
+A level is returned as a list of XSB rows (lists of characters or strings),
+which is what Board.from_xsb and WharehousePlan.from_xsb_matrix expect.
+
+A pack file is opened as a LevelPack: it is scanned once to build an index of
+the byte offsets of its levels (two integers per level), a level is only read
+and parsed when it is asked. The file is memory mapped by default, jumping to
+the last level of a pack of 10,000 levels does not read the other ones.
+
+The game and the tools read the packs, and the built-in levels, through their
+compact binary cache (packfile.py), built from the source at the first use and
+rebuilt when it changes. The source is read directly if the cache cannot be written.
+"""
+import mmap
+import os
+import re
+from array import array
+
+LEVELS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.txt")
+
+# consecutive lines containing a wall character
+TEXT_LEVEL = re.compile(rb"^[^\n#]*#.*(?:\n[^\n#]*#.*)*", re.M)
+SLC_LEVEL = re.compile(rb"<Level\b")
+SLC_LEVEL_END = b"</Level>"
+SLC_ID = re.compile(r'\bId\s*=\s*"([^"]*)"')
+SLC_ROW = re.compile(r"<L>(.*?)</L>", re.S)
+
+# packs already opened, by path: (mtime, size, pack)
+_packs = {}
+
+
+"""
+    The built-in levels, from their binary cache (the module is only imported to build it).
+"""
+def builtin_levels():
+    import packfile
+    try:
+        return packfile.cached_pack(packfile.BUILTIN_SOURCE)
+    except OSError:
+        import sokobanXSBLevels
+        return sokobanXSBLevels.SokobanXSBLevels
+
+
+def builtin_level(index: int) -> list:
+    return builtin_levels()[index]
+
+
+"""
+LevelPack: levels of a text or SLC pack file, parsed on demand.
+    #starts[i] and #ends[i] are the byte offsets of the level i in the file
+    (from its title line, if any, to the end of its last row).
+"""
+class LevelPack(object):
+    def __init__(self, path: str, use_mmap: bool = True) -> None:
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = None
+        if use_mmap and os.fstat(self.file.fileno()).st_size > 0:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.xml = self.is_xml()
+        self.starts = array('Q')
+        self.ends = array('Q')
+        if self.xml:
+            self.index_xml()
+        else:
+            self.index_text()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> list:
+        return self.entry(index)[1]
+
+    def __enter__(self) -> "LevelPack":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+        self.file.close()
+
+    def is_xml(self) -> bool:
+        if os.path.splitext(self.path)[1].lower() in (".slc", ".xml"):
+            return True
+        self.file.seek(0)
+        return self.file.read(64).lstrip().startswith(b"<")
+
+    def read(self, start: int, end: int) -> bytes:
+        if self.data is not None:
+            return self.data[start:end]
+        self.file.seek(start)
+        return self.file.read(end - start)
+
+    """
+        Index of a text pack: a level is a run of lines containing a wall (one
+        match of TEXT_LEVEL), it starts at the last title line (line without wall)
+        since the previous level.
+    """
+    def index_text(self) -> None:
+        data = self.contents()
+        previous_end = 0
+        for match in TEXT_LEVEL.finditer(data):
+            start = match.start()
+            # lines between the two levels, without the blank lines after the title
+            between = data[previous_end:start].rstrip()
+            if between.strip():
+                start = previous_end + between.rfind(b"\n") + 1
+            self.starts.append(start)
+            previous_end = match.end()
+            self.ends.append(previous_end)
+
+    """
+        Index of a SLC pack: from every <Level to the next </Level>.
+    """
+    def index_xml(self) -> None:
+        data = self.contents()
+        for match in SLC_LEVEL.finditer(data):
+            start = match.start()
+            end = data.find(SLC_LEVEL_END, start)
+            if end < 0:
+                break
+            self.starts.append(start)
+            self.ends.append(end + len(SLC_LEVEL_END))
+
+    # whole file, for the scan of the index
+    def contents(self):
+        if self.data is not None:
+            return self.data
+        return self.read(0, os.fstat(self.file.fileno()).st_size)
+
+    """
+        Returns the (title, rows) of the level #index, parsed from the file.
+    """
+    def entry(self, index: int) -> tuple:
+        text = self.read(self.starts[index], self.ends[index]).decode("utf-8", "replace")
+        if self.xml:
+            import html
+            match = SLC_ID.search(text)
+            title = html.unescape(match.group(1)) if match else None
+            return title, [html.unescape(row) for row in SLC_ROW.findall(text)]
+        title = None
+        rows = []
+        for line in text.splitlines():
+            if "#" in line:
+                rows.append(line)
+            elif line.strip():
+                title = line.strip()
+        return title, rows
+
+    def title(self, index: int):
+        return self.entry(index)[0]
+
+
+"""
+    Returns the levels of the pack #path: its binary cache (packfile.BinaryPack),
+    or its LevelPack if the cache cannot be written.
+"""
+def open_pack(path: str = LEVELS_FILE):
+    import packfile
+    try:
+        return packfile.cached_pack(path)
+    except OSError:
+        return open_text_pack(path)
+
+
+"""
+    Returns the LevelPack of #path, indexed once per process as long as the
+    file is not modified.
+"""
+def open_text_pack(path: str = LEVELS_FILE) -> LevelPack:
+    status = os.stat(path)
+    cached = _packs.get(path)
+    if cached is not None and cached[0] == status.st_mtime_ns and cached[1] == status.st_size:
+        return cached[2]
+    if cached is not None:
+        cached[2].close()
+    pack = LevelPack(path)
+    _packs[path] = (status.st_mtime_ns, status.st_size, pack)
+    return pack
+
+
+"""
+    Reads a text or SLC pack and returns the list of (title, rows) of its levels.
+    Lines which contain no wall character are titles or comments, they are
+    not part of the level.
+"""
+def read_level_file(path: str = LEVELS_FILE) -> list:
+    pack = open_pack(path)
+    return [pack.entry(index) for index in range(len(pack))]
+
+
+"""
+    Returns the rows of the level #index:
+        - of the built-in levels if #path is None
+        - of the pack #path otherwise (only this level is parsed)
+"""
+def load_level(index: int, path: str = None) -> list:
+    if path is None:
+        return builtin_level(index)
+    return open_pack(path)[index]
+
+
+"""
+    Number of levels of the pack #path (of the built-in levels if None).
+"""
+def level_count(path: str = None) -> int:
+    if path is None:
+        return len(builtin_levels())
+    return len(open_pack(path))
@@ -0,0 +1,288 @@
+"""
+Compact binary level packs (.sklp) and their cache.
+
+Format (little endian):
+    header:  magic "SKLP", version (u16), flags (u16), levels (u32),
+             size (u64), mtime (u64, ns) and SHA-1 (20 bytes) of the source file
+    offsets: levels + 1 offsets (u32) of the levels in the data, for random access
+    level:   width (u16), height (u16), hash (8 bytes, SHA-1 of the rows),
+             title length (u16) and title (UTF-8),
+             cells: 4 bits per cell, row by row, two cells per byte (CELL_CHARS)
+The rows shorter than the level are padded with the code 0, removed when decoded.
+
+The pack of a source (text or SLC pack, or the built-in levels module) is cached
+next to it ("levels.txt" -> "levels.txt.sklp", in CACHE_DIR if the directory is
+read-only) and memory mapped: loading a level reads a few hundred bytes, without
+importing or scanning the source. The cache is rebuilt when the size, the mtime
+or, if only the mtime changed, the SHA-1 of the source changes.
+
+Usage:
+    python3 packfile.py levels.txt -o levels.sklp     # convert a text or SLC pack
+    python3 packfile.py --builtin -o builtin.sklp     # convert sokobanXSBLevels
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import levels
+
+MAGIC = b"SKLP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQQ20s")
+LEVEL_HEADER = struct.Struct("<HH8sH")
+CACHE_EXTENSION = ".sklp"
+# SOKOBAN_CACHE_DIR replaces the whole directory: the push distances (distances.py)
+# are then cached in the same directory (files *.bin, the packs are *.sklp)
+CACHE_DIR = os.environ.get("SOKOBAN_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "packs"))
+# source of the built-in levels
+BUILTIN_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sokobanXSBLevels.py")
+
+# code -> character, the code 0 pads the short rows
+CELL_CHARS = "\0# .$*@+-"
+# character -> code, unknown characters are floor (code 2), as in Board.from_xsb
+CELL_CODES = bytearray([2]) * 256
+for code, c in enumerate(CELL_CHARS):
+    CELL_CODES[ord(c)] = code
+CELL_CODES = bytes(CELL_CODES)
+# code -> code of the first cell of a byte (high 4 bits)
+HIGH_CODES = bytes((code << 4) & 0xFF for code in range(256))
+# byte -> its two cells
+CELL_PAIRS = [CELL_CHARS[byte >> 4] + CELL_CHARS[byte & 15] if max(byte >> 4, byte & 15) < len(CELL_CHARS) else "  "
+              for byte in range(256)]
+
+# packs already mapped, by cache path
+_packs = {}
+
+
+def level_hash(rows) -> bytes:
+    return hashlib.sha1("\n".join("".join(row) for row in rows).encode("utf-8")).digest()[:8]
+
+
+"""
+    Binary record of the level #rows titled #title.
+"""
+def encode_level(title, rows) -> bytes:
+    rows = [row if isinstance(row, str) else "".join(row) for row in rows]
+    height = len(rows)
+    width = max(map(len, rows), default=0)
+    # the codes of all the cells at once, then the two cells of every byte merged as
+    # two big integers: the high and the low 4 bits never overlap
+    codes = "".join([row.ljust(width, "\0") for row in rows]).encode("ascii", "replace").translate(CELL_CODES)
+    if len(codes) % 2:
+        codes += b"\0"
+    high = codes[0::2].translate(HIGH_CODES)
+    cells = (int.from_bytes(high, "big") | int.from_bytes(codes[1::2], "big")).to_bytes(len(high), "big")
+    title = (title or "").encode("utf-8")
+    return LEVEL_HEADER.pack(width, height, level_hash(rows), len(title)) + title + cells
+
+
+def source_signature(path: str) -> tuple:
+    status = os.stat(path)
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return status.st_size, status.st_mtime_ns, digest.digest()
+
+
+"""
+    Writes the pack #entries ((title, rows) of every level) in #path, atomically.
+    #signature is the (size, mtime, SHA-1) of the source. With #count (the number
+    of levels), #entries is consumed as a stream, one level at a time: the table
+    of the offsets is reserved and written at the end.
+"""
+def write_pack(entries, path: str, signature: tuple = (0, 0, bytes(20)), count: int = None) -> int:
+    if count is None:
+        entries = list(entries)
+        count = len(entries)
+    offsets = array('I', [0])
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = path + "." + str(os.getpid()) + ".tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, count, *signature))
+            f.write(bytes(4 * (count + 1)))
+            for title, rows in entries:
+                record = encode_level(title, rows)
+                f.write(record)
+                offsets.append(offsets[-1] + len(record))
+            if len(offsets) != count + 1:
+                raise ValueError("expected " + str(count) + " levels, got " + str(len(offsets) - 1))
+            f.seek(HEADER.size)
+            f.write(struct.pack("<" + str(len(offsets)) + "I", *offsets))
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return HEADER.size + 4 * len(offsets) + offsets[-1]
+
+
+"""
+BinaryPack: levels of a .sklp file, decoded on demand (same interface as levels.LevelPack).
+"""
+class BinaryPack(object):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            self.data.close()
+            raise ValueError("truncated level pack " + path)
+        magic, version, flags, count, size, mtime, digest = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError("not a level pack " + path)
+        self.signature = (size, mtime, digest)
+        # (size, mtime) of the source last found identical, see is_fresh
+        self.verified = (size, mtime)
+        self.count = count
+        self.offsets = memoryview(self.data)[HEADER.size:HEADER.size + 4 * (count + 1)].cast('I')
+        self.base = HEADER.size + 4 * (count + 1)
+        if len(self.data) != self.base + self.offsets[count]:
+            self.close()
+            raise ValueError("truncated level pack " + path)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> list:
+        return self.entry(index)[1]
+
+    def close(self) -> None:
+        self.offsets.release()
+        self.data.close()
+
+    """
+        Returns the (title, rows) of the level #index.
+    """
+    def entry(self, index: int) -> tuple:
+        if not 0 <= index < self.count:
+            raise IndexError("level index out of range")
+        start = self.base + self.offsets[index]
+        width, height, digest, title_length = LEVEL_HEADER.unpack_from(self.data, start)
+        start += LEVEL_HEADER.size
+        title = self.data[start:start + title_length].decode("utf-8") or None
+        start += title_length
+        cells = "".join([CELL_PAIRS[byte] for byte in self.data[start:start + (width * height + 1) // 2]])
+        rows = [cells[y * width:(y + 1) * width].rstrip("\0") for y in range(height)]
+        return title, rows
+
+    # the title only, without decoding the cells
+    def title(self, index: int):
+        if not 0 <= index < self.count:
+            raise IndexError("level index out of range")
+        start = self.base + self.offsets[index] + LEVEL_HEADER.size
+        title_length = LEVEL_HEADER.unpack_from(self.data, start - LEVEL_HEADER.size)[3]
+        return self.data[start:start + title_length].decode("utf-8") or None
+
+
+"""
+    Levels of the source #path (a text or SLC pack, or BUILTIN_SOURCE for the
+    built-in levels): returns their number and an iterator of their (title, rows),
+    parsed one at a time from the index of the pack.
+"""
+def read_source(path: str) -> tuple:
+    if os.path.abspath(path) == BUILTIN_SOURCE:
+        import sokobanXSBLevels
+        return len(sokobanXSBLevels.SokobanXSBLevels), ((None, rows) for rows in sokobanXSBLevels.SokobanXSBLevels)
+    pack = levels.LevelPack(path)
+    return len(pack), pack_entries(pack)
+
+
+def pack_entries(pack: levels.LevelPack):
+    with pack:
+        for index in range(len(pack)):
+            yield pack.entry(index)
+
+
+def cache_paths(source: str) -> list:
+    source = os.path.abspath(source)
+    if source == BUILTIN_SOURCE:
+        beside = os.path.splitext(source)[0] + CACHE_EXTENSION
+    else:
+        beside = source + CACHE_EXTENSION
+    fallback = os.path.join(CACHE_DIR, hashlib.sha1(source.encode("utf-8")).hexdigest() + CACHE_EXTENSION)
+    return [beside, fallback]
+
+
+"""
+    Returns True if the pack #pack was built from the current contents of #source.
+"""
+def is_fresh(pack: BinaryPack, source: str) -> bool:
+    status = os.stat(source)
+    if pack.verified == (status.st_size, status.st_mtime_ns):
+        return True
+    if pack.signature[0] != status.st_size:
+        return False
+    # touched but maybe not modified: the contents are hashed once per mtime
+    if source_signature(source)[2] != pack.signature[2]:
+        return False
+    pack.verified = (status.st_size, status.st_mtime_ns)
+    return True
+
+
+def open_cached(path: str):
+    try:
+        return BinaryPack(path)
+    except (OSError, ValueError):
+        return None
+
+
+"""
+    Returns the binary pack of #source, from the cache if it is up to date,
+    converted and cached otherwise.
+"""
+def cached_pack(source: str = BUILTIN_SOURCE) -> BinaryPack:
+    paths = cache_paths(source)
+    for path in paths:
+        pack = _packs.get(path)
+        if pack is None:
+            pack = open_cached(path)
+        if pack is None:
+            continue
+        if is_fresh(pack, source):
+            _packs[path] = pack
+            return pack
+        if _packs.get(path) is not pack:
+            pack.close()
+    signature = source_signature(source)
+    for path in paths:
+        count, entries = read_source(source)
+        try:
+            write_pack(entries, path, signature, count)
+        except OSError:
+            # read-only directory: next place
+            continue
+        finally:
+            entries.close()
+        # a stale pack still used (by the game, ...) stays open: it is closed when released
+        pack = BinaryPack(path)
+        _packs[path] = pack
+        return pack
+    raise OSError("cannot write the cache of " + source)
+
+
+def main(argv=None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert a level pack to the binary .sklp format.")
+    parser.add_argument("source", nargs="?", help="text or SLC pack")
+    parser.add_argument("--builtin", action="store_true", help="convert the built-in levels (sokobanXSBLevels)")
+    parser.add_argument("-o", "--output", required=True, help=".sklp file written")
+    args = parser.parse_args(argv)
+    if args.builtin == (args.source is not None):
+        parser.error("give either a source pack or --builtin")
+    source = BUILTIN_SOURCE if args.builtin else args.source
+    count, entries = read_source(source)
+    size = write_pack(entries, args.output, source_signature(source), count)
+    print(str(count) + " levels, " + str(size) + " bytes (" + str(os.path.getsize(source)) + " bytes in "
+          + os.path.basename(source) + ")", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Headless replay of LURD move strings.
+
+A move string is played on a Board with the rules of the game (Board.move),
+without any rendering: l/u/r/d are moves, L/U/R/D pushes, whitespace is
+ignored and a number repeats the next character ("3l" == "lll"). With #strict,
+the case of every character must match what happened (a move must not push a
+box, a push must push one).
+
+Solutions file (read as a stream, one level at a time):
+    Level 3
+    ullDDrrdRRurU
+    lULLulDD
+
+    Level 4
+    ...
+The LURD lines following a title are the solution of this level. With the
+built-in levels, "Level N" is the level N of the game (as in "Choose a level").
+
+Usage:
+    python3 replay.py solutions.txt                 # built-in levels
+    python3 replay.py solutions.txt --pack levels.txt --strict
+"""
+import re
+import sys
+import time
+
+from board import Board, UP, DOWN, LEFT, RIGHT, PUSHED, BLOCKED
+import levels
+
+# character -> (direction, push expected)
+LURD = {'u': (UP, False), 'd': (DOWN, False), 'l': (LEFT, False), 'r': (RIGHT, False),
+        'U': (UP, True), 'D': (DOWN, True), 'L': (LEFT, True), 'R': (RIGHT, True)}
+# a line of moves holds at least one move: a line of digits only is a title ("12", an SLC Id)
+LURD_LINE = re.compile(r"[0-9udlrUDLR]*[udlrUDLR][0-9udlrUDLR]*")
+
+
+class ReplayResult(object):
+    def __init__(self, valid: bool, solved: bool, moves: int, pushes: int, error: str = None) -> None:
+        # False if a move was impossible (or did not match its case with #strict)
+        self.valid: bool = valid
+        self.solved: bool = solved
+        self.moves: int = moves
+        self.pushes: int = pushes
+        self.error: str = error
+
+    def __repr__(self) -> str:
+        status = "solved" if self.solved else "valid" if self.valid else "invalid"
+        return "ReplayResult(" + status + ", moves=" + str(self.moves) + ", pushes=" + str(self.pushes) + ")"
+
+
+"""
+    Expands the repetition counts of #lurd and drops the whitespace.
+    Raises ValueError on any other character.
+"""
+def expand(lurd: str) -> str:
+    if lurd.isalpha():
+        return lurd
+    characters = []
+    count = ""
+    for c in lurd:
+        if c.isdigit():
+            count += c
+        elif c in LURD:
+            characters.append(c * int(count) if count else c)
+            count = ""
+        elif not c.isspace():
+            raise ValueError("invalid character " + repr(c))
+    return "".join(characters)
+
+
+"""
+    Plays #lurd on #board (modified) and returns the result of the replay.
+    The replay stops at the first impossible move. The moves played are
+    recorded in #history (history.MoveLog) if given.
+"""
+def replay(board: Board, lurd: str, strict: bool = False, history=None) -> ReplayResult:
+    try:
+        lurd = expand(lurd)
+    except ValueError as error:
+        return ReplayResult(False, False, 0, 0, str(error))
+    move = board.move
+    moves = 0
+    pushes = 0
+    for c in lurd:
+        entry = LURD.get(c)
+        if entry is None:
+            return ReplayResult(False, False, moves, pushes, "invalid character " + repr(c) + " at move " + str(moves + 1))
+        result = move(entry[0])
+        if result == BLOCKED:
+            return ReplayResult(False, False, moves, pushes, "blocked at move " + str(moves + 1))
+        moves += 1
+        if history is not None:
+            history.record(entry[0], result == PUSHED)
+        if result == PUSHED:
+            pushes += 1
+            if strict and not entry[1]:
+                return ReplayResult(False, False, moves, pushes, "unexpected push at move " + str(moves))
+        elif strict and entry[1]:
+            return ReplayResult(False, False, moves, pushes, "no box pushed at move " + str(moves))
+    return ReplayResult(True, board.is_solved(), moves, pushes)
+
+
+"""
+    Streams the (title, lurd) solutions of the file #f: the LURD lines after a
+    title are joined, a level without solution lines is skipped. A LURD line
+    contains at least one move letter, any other line is a title.
+"""
+def read_solutions(f):
+    title = None
+    lines = []
+    for line in f:
+        line = line.strip()
+        if LURD_LINE.fullmatch(line):
+            lines.append(line)
+            continue
+        if lines:
+            yield title, "".join(lines)
+            lines = []
+        if line:
+            title = line
+    if lines:
+        yield title, "".join(lines)
+
+
+"""
+    Number N of the title "Level N", None for another title.
+"""
+def level_number(title: str):
+    if title is None:
+        return None
+    words = title.split()
+    if len(words) == 2 and words[0].lower() == "level" and words[1].isdigit():
+        return int(words[1])
+    return None
+
+
+"""
+    Replays every solution of the file #path against its level and writes one line
+    per level. Returns the number of solutions and of solutions which pass.
+"""
+def replay_file(path: str, pack: str = None, strict: bool = False, output=sys.stdout) -> tuple:
+    if pack is None:
+        pack_levels = levels.builtin_levels()
+        by_title = None
+    else:
+        # the levels are read when they are replayed, only the titles are read here
+        pack_levels = levels.open_pack(pack)
+        by_title = {pack_levels.title(index): index for index in range(len(pack_levels))}
+    total = 0
+    passed = 0
+    with open(path, 'r') as f:
+        for title, lurd in read_solutions(f):
+            total += 1
+            index = by_title.get(title) if by_title is not None else level_number(title)
+            if index is None or not 0 <= index < len(pack_levels):
+                output.write(str(title) + ": FAIL unknown level\n")
+                continue
+            start = time.perf_counter()
+            board = Board.from_xsb(pack_levels[index])
+            result = replay(board, lurd, strict)
+            elapsed = (time.perf_counter() - start) * 1000
+            if result.solved:
+                passed += 1
+                status = "pass"
+            else:
+                status = "FAIL " + (result.error or "not solved")
+            output.write(str(title) + ": " + status + " moves=" + str(result.moves) + " pushes=" + str(result.pushes)
+                         + " " + str(round(elapsed, 3)) + " ms\n")
+    return total, passed
+
+
+def main(argv=None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay LURD solutions against their levels.")
+    parser.add_argument("solutions", help="solutions file (\"Level N\" titles followed by LURD lines)")
+    parser.add_argument("--pack", help="text pack of the levels, matched by title (default: the built-in levels)")
+    parser.add_argument("--strict", action="store_true", help="the case of every move must match (push or not)")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    total, passed = replay_file(args.solutions, args.pack, args.strict)
+    elapsed = time.perf_counter() - start
+    print("passed " + str(passed) + "/" + str(total) + " in " + str(round(elapsed, 3)) + " s", file=sys.stderr)
+    if passed != total:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Score store of the players, in a SQLite database.
+
+Every win is one atomic upsert of the row of the player (indexed by its
+username): its cost does not depend on the number of players, and several
+instances of the game can write at the same time (WAL journal, writers wait
+for each other up to TIMEOUT seconds) without losing or corrupting scores.
+
+Every win is also recorded with its number of moves and pushes and its time
+(table wins). The table records keeps, for every player and level, one whole win
+per ranking: the win with the fewest moves (then pushes), the one with the fewest
+pushes (then moves) and the fastest one. A record is only replaced by a better
+win, its moves, pushes and time always come from the same win. The leaderboard
+queries (top_levels, top_moves, top_pushes, top_times) read a page of an index:
+their cost depends on the size of the page, not on the number of players.
+The wins and records of the levels of a pack are kept under the path of the pack
+(BUILTIN_PACK for the built-in levels), only the built-in levels count for the
+best level of a player.
+
+The version of the schema is kept in the database (PRAGMA user_version): the
+records of an older database are rebuilt from its wins when it is opened.
+
+The scores of the former score.json file ({"username": level, ...}) are
+imported once, when the database is created (see migrate_json).
+"""
+import json
+import os
+import time
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+SCORE_DB = os.path.join(GAME_DIR, "scores.db")
+SCORE_JSON = os.path.join(GAME_DIR, "score.json")
+# seconds a writer waits for the lock of another instance of the game
+TIMEOUT = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    username TEXT PRIMARY KEY,
+    level INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY
+);
+CREATE INDEX IF NOT EXISTS players_by_level ON players (level DESC, username);
+CREATE TABLE IF NOT EXISTS wins (
+    id INTEGER PRIMARY KEY,
+    pack TEXT NOT NULL DEFAULT '',
+    username TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    moves INTEGER NOT NULL,
+    pushes INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    won_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    ranking TEXT NOT NULL,
+    pack TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    username TEXT NOT NULL,
+    moves INTEGER NOT NULL,
+    pushes INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (ranking, pack, level, username)
+);
+CREATE INDEX IF NOT EXISTS records_by_moves ON records (ranking, pack, level, moves, pushes);
+CREATE INDEX IF NOT EXISTS records_by_pushes ON records (ranking, pack, level, pushes, moves);
+CREATE INDEX IF NOT EXISTS records_by_time ON records (ranking, pack, level, seconds)
+"""
+SCHEMA_VERSION = 3
+# pack of the built-in levels in the tables wins and records
+BUILTIN_PACK = ""
+
+# ranking -> condition for a win (excluded) to replace the record of the player
+RANKINGS = {
+    "moves": "(excluded.moves, excluded.pushes) < (records.moves, records.pushes)",
+    "pushes": "(excluded.pushes, excluded.moves) < (records.pushes, records.moves)",
+    "time": "excluded.seconds < records.seconds",
+}
+# (username, level) of a player: the best level is kept
+UPSERT_PLAYER = ("INSERT INTO players (username, level) VALUES (?, ?) "
+                 "ON CONFLICT (username) DO UPDATE SET level = max(level, excluded.level)")
+# upsert of the records from a source of (ranking, pack, level, username, moves, pushes, seconds) rows
+UPSERT_RECORD = ("INSERT INTO records (ranking, pack, level, username, moves, pushes, seconds) {} "
+                 "ON CONFLICT (ranking, pack, level, username) DO UPDATE SET moves = excluded.moves, "
+                 "pushes = excluded.pushes, seconds = excluded.seconds WHERE {}")
+
+# leaderboard rows per page
+PAGE_SIZE = 20
+
+# process-wide store of the game, see default_store
+_default_store = None
+
+
+class ScoreStore(object):
+    def __init__(self, path: str = SCORE_DB, json_path: str = None) -> None:
+        # imported with the first store: the game does not pay for it at startup
+        import sqlite3
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=TIMEOUT)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            # the lock is taken first: a concurrent instance waits for the end of the upgrade
+            self.connection.execute("BEGIN IMMEDIATE")
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                self.upgrade()
+        if json_path is not None:
+            self.migrate_json(json_path)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    """
+        Creates the tables of a new database, or upgrades the tables of an older
+        one: the records are rebuilt from the wins, in the order they were won.
+    """
+    def upgrade(self) -> None:
+        self.connection.execute("DROP TABLE IF EXISTS records")
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(wins)")]
+        if columns and "pack" not in columns:
+            # wins of a database older than the level packs: built-in levels
+            self.connection.execute("ALTER TABLE wins ADD COLUMN pack TEXT NOT NULL DEFAULT ''")
+        for statement in SCHEMA.split(";"):
+            self.connection.execute(statement)
+        for ranking, better in RANKINGS.items():
+            # "WHERE true": the ON CONFLICT clause of an INSERT ... SELECT must follow a WHERE
+            self.connection.execute(UPSERT_RECORD.format(
+                "SELECT ?, pack, level, username, moves, pushes, seconds FROM wins WHERE true ORDER BY id", better), (ranking,))
+        self.connection.execute("PRAGMA user_version = " + str(SCHEMA_VERSION))
+
+    """
+        Records the win of the level #level by #username in #moves moves, #pushes pushes
+        and #seconds seconds, in a single transaction. Returns the best level of the player.
+        #pack is the path of the level pack, None for the built-in levels: the levels
+        of the packs have their own records and do not change the best level.
+    """
+    def record_win(self, username: str, level: int, moves: int, pushes: int, seconds: float, pack: str = None) -> int:
+        with self.connection:
+            if pack is None:
+                self.connection.execute(UPSERT_PLAYER, (username, level))
+            pack = BUILTIN_PACK if pack is None else pack
+            self.connection.execute(
+                "INSERT INTO wins (pack, username, level, moves, pushes, seconds, won_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (pack, username, level, moves, pushes, seconds, time.time()))
+            # the record of every ranking is replaced by the whole win if it beats it
+            for ranking, better in RANKINGS.items():
+                self.connection.execute(UPSERT_RECORD.format("VALUES (?, ?, ?, ?, ?, ?, ?)", better),
+                                        (ranking, pack, level, username, moves, pushes, seconds))
+        return self.best_level(username)
+
+    """
+        Best level won by #username, None if the player is unknown.
+    """
+    def best_level(self, username: str):
+        row = self.connection.execute("SELECT level FROM players WHERE username = ?", (username,)).fetchone()
+        return None if row is None else row[0]
+
+    """
+        (username, level) of all the players, by username.
+    """
+    def players(self) -> list:
+        return self.connection.execute("SELECT username, level FROM players ORDER BY username").fetchall()
+
+    """
+        Page #page (from 0) of the players by highest level: (username, level) rows.
+    """
+    def top_levels(self, page: int = 0, page_size: int = PAGE_SIZE) -> list:
+        return self.connection.execute(
+            "SELECT username, level FROM players ORDER BY level DESC, username LIMIT ? OFFSET ?",
+            (page_size, page * page_size)).fetchall()
+
+    """
+        Page #page of the players of the level #level (of the pack #pack, None for
+        the built-in levels) by fewest moves (then pushes): (username, moves, pushes,
+        seconds) rows, each of them from a single win.
+    """
+    def top_moves(self, level: int, page: int = 0, page_size: int = PAGE_SIZE, pack: str = None) -> list:
+        return self.connection.execute(
+            "SELECT username, moves, pushes, seconds FROM records WHERE ranking = 'moves' AND pack = ? AND level = ? "
+            "ORDER BY moves, pushes LIMIT ? OFFSET ?",
+            (BUILTIN_PACK if pack is None else pack, level, page_size, page * page_size)).fetchall()
+
+    """
+        Page #page of the players of the level #level by fewest pushes (then moves).
+    """
+    def top_pushes(self, level: int, page: int = 0, page_size: int = PAGE_SIZE, pack: str = None) -> list:
+        return self.connection.execute(
+            "SELECT username, moves, pushes, seconds FROM records WHERE ranking = 'pushes' AND pack = ? AND level = ? "
+            "ORDER BY pushes, moves LIMIT ? OFFSET ?",
+            (BUILTIN_PACK if pack is None else pack, level, page_size, page * page_size)).fetchall()
+
+    """
+        Page #page of the players of the level #level by best time.
+    """
+    def top_times(self, level: int, page: int = 0, page_size: int = PAGE_SIZE, pack: str = None) -> list:
+        return self.connection.execute(
+            "SELECT username, moves, pushes, seconds FROM records WHERE ranking = 'time' AND pack = ? AND level = ? "
+            "ORDER BY seconds LIMIT ? OFFSET ?",
+            (BUILTIN_PACK if pack is None else pack, level, page_size, page * page_size)).fetchall()
+
+    """
+        Imports the scores of the JSON file #json_path, once per database: the file
+        is left untouched, the best level is kept for the players already known.
+        Returns the number of players imported.
+    """
+    def migrate_json(self, json_path: str) -> int:
+        name = "json:" + os.path.basename(json_path)
+        if self.connection.execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone():
+            return 0
+        try:
+            with open(json_path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        rows = [(username, int(level)) for username, level in data.items()
+                if username is not None and username != "null" and level is not None]
+        with self.connection:
+            # a concurrent instance may have migrated in the meantime: the marker is the lock
+            cursor = self.connection.execute("INSERT OR IGNORE INTO migrations (name) VALUES (?)", (name,))
+            if cursor.rowcount == 0:
+                return 0
+            self.connection.executemany(UPSERT_PLAYER, rows)
+        return len(rows)
+
+
+"""
+    Store of the game (SCORE_DB next to the game), opened on first use and
+    migrated from score.json.
+"""
+def default_store() -> ScoreStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = ScoreStore(SCORE_DB, SCORE_JSON)
+    return _default_store
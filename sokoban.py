@@ -0,0 +1,902 @@
+"""
+@author: Florent Delalande 
+
+This project is a Sokoban game in Python with Tkinter.
+It was programmed as part of the PCO (Object-Oriented Design Project) course during my 2nd year at the University of Brest.
+
+Run the game with `python3 sokoban.py`. The module can be imported by tools without
+opening a window: the levels are read one by one when played (levels.py), the
+score database is opened at the first win or display of the scores (scores.py).
+
+"""
+import tkinter as tk
+import tkinter.messagebox as tkMessageBox
+import tkinter.simpledialog
+import tkinter.filedialog
+from tkinter import messagebox
+
+import levels
+from board import Board, InvalidLevel, PUSHED
+import deadlock
+import sprites
+from viewport import Viewport
+from frames import FrameClock, InputQueue
+from animations import AnimationScheduler, RingAnimation
+from history import MoveLog
+import replay
+import scores
+from enum import Enum
+import time
+import os
+
+IMAGE_SIZE = 64
+# rendering mode: the walls and goals are composed into a single image (True)
+# or drawn as one canvas item per tile (False)
+STATIC_LAYER = True
+# tiles kept free around the largest window, the levels larger than it are scrolled (see viewport.py)
+WINDOW_MARGIN = 2
+# actions of the input queue other than the directions
+UNDO = "undo"
+REDO = "redo"
+
+
+"""
+Direction:
+    Useful for managing the calculation of positions for movements
+"""
+class Direction(Enum):
+    Up = 1
+    Down = 2
+    Left = 3
+    Right = 4
+
+    # Direction of the headless board (board.UP, board.DOWN, board.LEFT, board.RIGHT)
+    def board_index(self) -> int:
+        return self.value - 1
+
+    def opposite(self):
+        match self:
+            case Direction.Up:
+                return Direction.Down
+            case Direction.Down:
+                return Direction.Up
+            case Direction.Left:
+                return Direction.Right
+            case Direction.Right:
+                return Direction.Left
+
+
+# keysym -> direction of the mover
+ARROW_KEYS = {'Up': Direction.Up, 'Down': Direction.Down, 'Left': Direction.Left, 'Right': Direction.Right}
+
+"""
+Entity class represents a generic entity in the Sokoban game.
+It is an abstract class that is inherited by other classes.
+Attributes:
+    image (tk.PhotoImage): A class attribute that holds the image representation of the entity
+        (shared by all the entities with the same sprite, see sprites.py).
+Methods:
+    __init__() -> None:
+        Initializes a new instance of the Entity class.
+    is_movable() -> bool:
+        Determines if the entity can be moved.
+    can_be_covered() -> bool:
+        Determines if the entity can be covered by another entity.
+    xsb_char() -> str:
+        Returns the character representation of the entity for XSB (Sokoban) file format.
+"""
+class Entity(object):
+    image: tk.PhotoImage = None
+    
+    def __init__(self) -> None:
+        # It is an abstract method that is inherited by other classes.
+        pass
+
+    def is_movable(self) -> bool:
+        # It is an abstract method that is inherited by other classes.
+        pass
+
+    def can_be_covered(self) -> bool:
+        # It is an abstract method that is inherited by other classes.
+        pass
+
+    def xsb_char(self) -> str:
+        # It is an abstract method that is inherited by other classes.
+        pass
+
+"""
+Player:
+    - storage of the score (best level won), in the score store (scores.py)
+    - incrementing the score
+    - displaying the score
+"""
+class Player(object):
+    def __init__(self, username, score) -> None:
+        self.username = username
+        self.score = score
+
+    # One atomic write per win: the best level of the player is kept by the store,
+    # with the moves, pushes and time of the win for the leaderboard
+    # #pack_path: pack of the level, None for the built-in levels (the only ones counted in the score)
+    @classmethod
+    def win(cls, username, level_num, moves=0, pushes=0, seconds=0.0, pack_path=None) -> None:
+        if not username:
+            return
+        cls.username = username
+        cls.score = scores.default_store().record_win(username, level_num, moves, pushes, seconds, pack_path)
+
+"""
+    Players:
+    - storage of Players
+    - displaying Players
+
+"""
+class Players(object):
+    @classmethod
+    def read_from_file(cls):
+        cls.player_list = [Player(username, level) for username, level in scores.default_store().players()]
+        return cls.player_list
+
+"""
+Position:
+    - storage of x and y coordinates,
+    - verification of x and y in relation to a matrix
+    - calculation of relative position from an offset and a direction 
+"""
+class Position(object):
+    def __init__(self, x, y):
+        self.x: int = x
+        self.y: int = y
+
+    def __str__(self):
+        return 'Position(' + str(self.x) + ',' + str(self.y) + str(')') 
+
+    def get_x(self):
+        return self.x
+
+    def get_y(self):
+        return self.y
+
+    # returns the position towards the direction #direction considering the offset
+    #   Position(3,4).position_towards(Direction.Right, 2) == Position(5,4)
+    def position_towards(self, direction: Direction, offset: int):
+        new_pos = Position(self.x, self.y)
+        match direction:
+            case Direction.Left:
+                new_pos.x -= offset
+            case Direction.Up:
+                new_pos.y -= offset
+            case Direction.Right:
+                new_pos.x += offset
+            case Direction.Down:
+                new_pos.y +=offset
+        return new_pos
+
+    # Returns True if the coordinates are valid in the warehouse
+    def is_valid_in_wharehouse(self, wharehouse):
+        return wharehouse.isPositionValid(self)
+
+    # Converts the receiver to a corresponding position in a Canvas
+    def as_canvas_position_in(self):
+        lx = self.get_x() * IMAGE_SIZE
+        ly = self.get_y() * IMAGE_SIZE
+        return Position(lx, ly)
+
+"""
+WharehousePlan: Warehouse plan to store elements.
+    The state of the game is stored in a headless Board (#board): walls and goals
+    in a flat array of cell codes, the boxes and the mover as cell indices.
+    The plan only keeps the entities needed to render this board.
+    The walls and goals are drawn as a single pre-rendered image (STATIC_LAYER),
+    or as Wall and Goal entities, one canvas item per tile.
+    The levels larger than the window are shown through a Viewport (#viewport)
+    following the mover: only the visible walls and goals have a canvas item.
+    A move only changes the state and the entities: the entities changed since the
+    last frame (#dirty) are drawn by #render, called once per frame by the Level.
+    All the animations of the level are run by a single scheduler (#animations).
+    The moves played are kept in a compact MoveLog (#history) for the undo and the redo.
+    The dead squares of the level (#dead_squares) are computed once per level
+    and allow to warn the player as soon as a box is pushed on one of them.
+"""
+class WharehousePlan(object):
+    level_num = 0
+    # pack of the level (see levels.py), None for the built-in levels
+    pack_path = None
+
+    def __init__(self):
+        self.board: Board = None
+        self.canvas: tk.Canvas = None
+        self.boxes: dict[int, Box] = {}
+        self.mover: Mover = None
+        self.dead_squares: bytearray = None
+        self.static_image: tk.PhotoImage = None
+        self.viewport: Viewport = None
+        self.dirty: list = []
+        self.animations: AnimationScheduler = None
+        self.history: MoveLog = MoveLog()
+        # start of the level, for the time of the win
+        self.started: float = time.monotonic()
+
+    def get_level_num(self):
+        return self.level_num
+
+    def get_mover(self):
+        return self.mover
+
+    # #board: the level already parsed from #xsb_matrix (e.g. to validate it), parsed here if None
+    @classmethod
+    def from_xsb_matrix(cls, xsb_matrix, canvas, level_num=None, static_layer=STATIC_LAYER, view=None, pack_path=None,
+                        board=None):
+        plan = cls()
+        plan.canvas = canvas
+        plan.animations = AnimationScheduler(canvas)
+        plan.board = board if board is not None else Board.from_xsb(xsb_matrix)
+        plan.pack_path = pack_path
+        if level_num is not None:
+            plan.level_num = level_num
+        # the level N of a pack is not the built-in level N: same key as the solver
+        plan.dead_squares = deadlock.dead_squares(plan.board, None if level_num is None else (pack_path, level_num))
+
+        # Only the walls and the goals are drawn, the floor is the background of the canvas.
+        # The walls are the '#' of the level (the board also considers the end of the short lines as walls).
+        board = plan.board
+        walls = [(x, y) for y in range(len(xsb_matrix)) for x in range(len(xsb_matrix[y])) if xsb_matrix[y][x] == '#']
+        goals = [board.coordinates(index) for index in sorted(board.goals)]
+        if view is not None:
+            # (columns, rows) of the window smaller than the level
+            plan.viewport = Viewport(canvas, board.width, board.height, set(walls), set(goals), view[0], view[1], IMAGE_SIZE)
+        elif static_layer:
+            plan.static_image = sprites.static_layer(board.width, board.height, walls, goals, IMAGE_SIZE)
+            canvas.create_image(0, 0, image=plan.static_image, anchor=tk.NW, tag="static")
+        else:
+            for x, y in walls:
+                Wall(canvas, Position(x, y))
+            for x, y in goals:
+                Goal(canvas, Position(x, y))
+        for index in board.boxes:
+            plan.boxes[index] = Box(canvas, plan, plan.position_of(index), board.is_goal(index))
+        plan.mover = Mover(canvas, plan, plan.position_of(board.player))
+        plan.start_position = plan.position_of(board.player)
+        plan.canvas.tag_raise("movable","static")
+        plan.follow(plan.start_position)
+        return plan
+
+    # Converts a cell index of the board to a Position
+    def position_of(self, index) -> Position:
+        x, y = self.board.coordinates(index)
+        return Position(x, y)
+
+    # Converts a Position to a cell index of the board
+    def index_of(self, position: Position) -> int:
+        return self.board.index(position.x, position.y)
+
+    # Instrumentation: number of items currently on the canvas. Once the animations are
+    # over, it only depends on the level (one item per wall, goal, box and mover),
+    # not on the number of moves played.
+    def live_canvas_items(self) -> int:
+        return len(self.canvas.find_all())
+
+    # Scrolls the viewport, if any, to keep #position (the mover) visible
+    def follow(self, position: Position) -> None:
+        if self.viewport is not None:
+            self.viewport.follow(position.x, position.y)
+
+    # Reverts the last move played: the board pulls the box back if the move was a push,
+    # the entities are moved back. O(1), the warehouse is not rebuilt.
+    def undo(self) -> bool:
+        step = self.history.undo()
+        if step is None:
+            return False
+        direction, pushed = step
+        board = self.board
+        if pushed:
+            box = self.boxes[board.player + board.offsets[direction]]
+        board.unmove(direction, pushed)
+        if pushed:
+            box.move_towards(Direction(direction + 1).opposite())
+        self.mover.place(self.position_of(board.player))
+        return True
+
+    # Plays again the last move undone
+    def redo(self) -> bool:
+        step = self.history.redo()
+        if step is None:
+            return False
+        self.mover.move_towards(Direction(step[0] + 1), record=False)
+        return True
+
+    # Plays the LURD string #lurd with the rules of the game but without drawing the
+    # intermediate states: the entities are placed at the end, in a single frame.
+    def fast_forward(self, lurd: str) -> replay.ReplayResult:
+        result = replay.replay(self.board, lurd, history=self.history)
+        self.place_entities()
+        return result
+
+    # Places the entities on the cells of the board: the boxes already on a cell
+    # with a box stay there, the other ones are moved to the remaining cells
+    def place_entities(self) -> None:
+        cells = self.board.boxes
+        boxes = {index: box for index, box in self.boxes.items() if index in cells}
+        moved = [box for index, box in self.boxes.items() if index not in cells]
+        free = [index for index in cells if index not in boxes]
+        for box, index in zip(moved, free):
+            box.place(self.position_of(index))
+            boxes[index] = box
+        self.boxes = boxes
+        self.mover.place(self.position_of(self.board.player))
+
+    # Starts a ring animation #tag of the color #color on the tile #position,
+    # replacing the running animation of the same #key
+    def animate(self, key, position: Position, color: str, tag: str) -> None:
+        self.animations.start(key, RingAnimation(position.x * IMAGE_SIZE, position.y * IMAGE_SIZE, IMAGE_SIZE, color, tag))
+
+    # Marks #entity (Box or Mover) to be drawn at the next frame
+    def invalidate(self, entity) -> None:
+        if entity.drawn:
+            entity.drawn = False
+            self.dirty.append(entity)
+
+    # Draws the entities changed since the last frame: an entity moved several
+    # times during the frame is drawn once, at its last position
+    def render(self) -> None:
+        for entity in self.dirty:
+            entity.draw()
+        self.dirty.clear()
+        self.follow(self.mover.position)
+
+    # Identity of the current state (boxes and mover), see Board.state_hash
+    def state_hash(self) -> int:
+        return self.board.state_hash()
+
+    # Returns True if the box just pushed on #position makes the level unwinnable:
+    # dead square, 2x2 block or frozen boxes (only the neighbourhood of the box is examined)
+    def is_deadlock_at(self, position: Position) -> bool:
+        return deadlock.is_deadlock_after_push(self.board, self.index_of(position), self.dead_squares)
+
+    def has_free_place_at(self, position):
+        index = self.index_of(position)
+        return not self.board.is_wall(index) and not self.board.has_box(index)
+        
+    
+"""
+Goal:
+    Represents a location to be covered by a BOX (game objective).
+    The mover must cover all these cells with boxes.
+    A Goal is static, it is always drawn below:
+        The zOrder is ensured by the tag of create_image (tag='static')
+        and self.canvas.tag_raise("movable","static") in Level
+"""
+class Goal(Entity):
+    def __init__(self, canvas, position):
+        self.canvas: tk.Canvas = canvas
+        self.position: Position = position
+        self.image = sprites.get("goal", IMAGE_SIZE)
+        self.id = self.canvas.create_image(self.position.get_x() * IMAGE_SIZE, self.position.get_y() * IMAGE_SIZE, image=self.image, anchor=tk.NW, tag="static")
+
+
+    def isMovable(self):
+        return False
+
+    def can_be_covered(self):
+        return True
+        
+    def xsb_char(self):
+        return '.'
+
+    def is_free_place(self):
+        return False
+
+"""
+Wall: to delimit the walls
+    The mover cannot pass through a wall.
+    A Wall is static, it is always drawn below:
+        The zOrder is ensured by the tag of create_image (tag='static')
+        and self.canvas.tag_raise("movable","static") in Level
+"""
+class Wall(Entity):
+    def __init__(self, canvas, position):
+        self.canvas: tk.Canvas = canvas
+        self.position: Position = position
+        self.image = sprites.get("wall", IMAGE_SIZE)
+        self.id = self.canvas.create_image(self.position.get_x() * IMAGE_SIZE, self.position.get_y() * IMAGE_SIZE, image=self.image, anchor=tk.NW, tag="static")
+
+    def getHeight(self):
+        return IMAGE_SIZE
+    
+    def getWidth(self):
+        return IMAGE_SIZE
+
+    def isMovable(self):
+        return False
+
+    def can_be_covered(self):
+        return False
+
+    def xsb_char(self):
+        return '#'
+
+    def is_free_place(self):
+        return False
+
+"""
+Box: Box to be moved by the mover.
+    Since a box needs to be moved, the canvas and the matrix are necessary to
+    reconstruct the image and implement its movement (in the canvas and in the matrix)
+    A Box is "movable", it is always drawn above the "static" objects:
+        The zOrder is ensured by the tag of create_image (tag='movable')
+        and self.canvas.tag_raise("movable","static") in Level
+    A Box is represented differently (different image) depending on whether it is on a Goal or not.
+    A Box owns a single canvas item during its whole life: it is moved and its image
+    is changed, it is never deleted and created again.
+ """
+class Box(Entity):
+    def __init__(self, canvas: tk.Canvas, wharehouse: WharehousePlan, position: Position, ongoal: bool = False):
+        self.canvas: tk.Canvas = canvas
+        self.wharehouse: WharehousePlan = wharehouse
+        self.position: Position = position
+        self.onGoal: bool = ongoal
+        if self.onGoal:
+            self.image = sprites.get("boxOnTarget", IMAGE_SIZE)
+        else:
+            self.image = sprites.get("box", IMAGE_SIZE)
+        self.id = self.canvas.create_image(self.position.get_x() * IMAGE_SIZE, self.position.get_y() * IMAGE_SIZE, image=self.image, anchor=tk.NW, tag="movable")
+        # False while the canvas item does not show the last position or image
+        self.drawn = True
+        if self.onGoal:
+            self.startOnGoalAnimation()
+
+    def isMovable(self):
+        return True
+
+    def draw(self):
+        self.canvas.coords(self.id, self.position.x * IMAGE_SIZE, self.position.y * IMAGE_SIZE)
+        self.canvas.itemconfigure(self.id, image=self.image)
+        self.drawn = True
+
+    def can_be_covered(self):
+        return False
+
+    """
+        Moves the Box (already pushed on the board) in the direction #direction:
+        its canvas item will be moved, and its image changed if it enters or leaves a goal,
+        at the next frame.
+    """
+    def move_towards(self, direction):
+        del self.wharehouse.boxes[self.wharehouse.index_of(self.position)]
+        self.position = self.position.position_towards(direction, 1)
+        index = self.wharehouse.index_of(self.position)
+        self.wharehouse.boxes[index] = self
+        self.wharehouse.invalidate(self)
+        self.set_on_goal(self.wharehouse.board.is_goal(index))
+
+    # Moves the Box to #position, its index in the boxes of the warehouse is updated by the caller
+    def place(self, position: Position):
+        self.position = position
+        self.wharehouse.invalidate(self)
+        self.set_on_goal(self.wharehouse.board.is_goal(self.wharehouse.index_of(position)))
+
+    def set_on_goal(self, ongoal: bool):
+        if ongoal == self.onGoal:
+            return
+        self.onGoal = ongoal
+        if self.onGoal:
+            self.image = sprites.get("boxOnTarget", IMAGE_SIZE)
+            self.startOnGoalAnimation()
+        else:
+            self.image = sprites.get("box", IMAGE_SIZE)
+        self.wharehouse.invalidate(self)
+
+    def xsb_char(self):
+        if self.under.is_free_place(): return '$'
+        else: return '*'
+
+    def is_free_place(self):
+        return False
+    
+    def __eq__(self, other):
+        # Define here the comparison logic for Box objects
+        # For example, if the attributes are equal, return True, otherwise False
+        res = self.canvas == other.canvas and self.wharehouse == other.wharehouse and self.position.get_x() == other.position.get_x() and self.position.get_y() == other.position.get_y()
+        return res
+    
+    # The animations of a box are keyed by its canvas item: pushing the box again
+    # replaces its running animation
+    def startOnGoalAnimation(self):
+        self.wharehouse.animate(("OnGoal", self.id), self.position, "yellow", "OnGoal")
+
+    def startDeadlockAnimation(self):
+        self.wharehouse.animate(("Deadlock", self.id), self.position, "orange", "Deadlock")
+
+"""
+Mover: This is the mover.
+    The Mover class implements the game logic in #can_move and #move_towards.
+    Since a Mover moves, the canvas and the board are necessary to
+    move its canvas item and implement its movement (in the canvas and in the board).
+    A Mover owns a single canvas item, moved with coords and changed with itemconfigure
+    when the frame is rendered (see WharehousePlan.render).
+    A Mover is "movable", it is always drawn above the "static" objects:
+        The zOrder is ensured by the tag of create_image (tag='movable')
+        and self.canvas.tag_raise("movable","static") in Level.
+    A Box is represented differently (different image) depending on the direction of movement (even if the movement turns out to be impossible).
+"""
+class Mover(object):
+    def __init__(self, canvas, wharehouse, position):  
+        self.canvas: tk.Canvas = canvas
+        self.wharehouse: WharehousePlan = wharehouse
+        self.position: Position = position
+        self.image = sprites.get("player", IMAGE_SIZE)
+        self.id = self.canvas.create_image(self.position.get_x() * IMAGE_SIZE, self.position.get_y() * IMAGE_SIZE, image=self.image, anchor=tk.NW, tag="movable")
+        self.drawn = True
+
+    def is_moveable(self):
+        return True
+
+    def draw(self):
+        self.canvas.coords(self.id, self.position.x * IMAGE_SIZE, self.position.y * IMAGE_SIZE)
+        self.canvas.itemconfigure(self.id, image=self.image)
+        self.drawn = True
+
+    """
+        Returns True if the Mover can move in the requested direction.
+        The calculation is done by the board: it requires seeing the adjacent element but also the next element (offset of 2).
+    """
+    def can_move(self, direction: Direction):
+        if self.wharehouse.board.can_move(direction.board_index()):
+            return True
+        self.start_impossible_push_animation()
+        return False
+
+    """
+        For the movement, the board possibly moves the Box and then moves the Mover.
+        The canvas items of the entities are moved to their new position at the next frame.
+        The move is recorded in the history of the warehouse, unless it is a redo (#record False).
+    """
+    def move_towards(self, direction, record=True):
+        self.setup_image_for_direction(direction)
+        if not self.can_move(direction):
+            return
+        pushed = self.wharehouse.board.move(direction.board_index()) == PUSHED
+        if record:
+            self.wharehouse.history.record(direction.board_index(), pushed)
+        if pushed:
+            self.push(direction)
+        self.position = self.position.position_towards(direction, 1)
+        self.wharehouse.invalidate(self)
+
+    # Moves the Mover back to #position (undo)
+    def place(self, position: Position):
+        self.position = position
+        self.wharehouse.invalidate(self)
+
+    """
+        The Mover is represented differently depending on the direction of movement.
+    """
+    def setup_image_for_direction(self, direction: Direction):
+        match direction:
+            case Direction.Up:
+                self.image = sprites.get("playerUp", IMAGE_SIZE)
+            case Direction.Down:
+                self.image = sprites.get("player", IMAGE_SIZE)
+            case Direction.Left:
+                self.image = sprites.get("playerLeft", IMAGE_SIZE)
+            case Direction.Right:
+                self.image = sprites.get("playerRight", IMAGE_SIZE)
+        self.wharehouse.invalidate(self)
+
+    """
+        Redraws the Box pushed by the board in the direction #direction:
+            - the box is drawn differently if it is pushed on a goal
+            - the game is won when the last goal is covered
+            - the player is warned if the push makes the level unwinnable (deadlock)
+    """
+    def push(self, direction):
+        position_intermediate = self.position.position_towards(direction, 1)
+        box = self.wharehouse.boxes[self.wharehouse.index_of(position_intermediate)]
+        box.move_towards(direction)
+        # check if the box is on a goal
+        if box.onGoal and self.end_game():
+            self.win()
+            return
+        if self.wharehouse.is_deadlock_at(box.position):
+            box.startDeadlockAnimation()
+
+    def win(self):
+        # the winning push is shown before the dialog
+        self.wharehouse.render()
+        username = tkinter.simpledialog.askstring("Sokoban", "You won!\n Enter your name:")
+        history = self.wharehouse.history
+        Player.win(username, self.wharehouse.get_level_num(), len(history), history.pushes(),
+                   round(time.monotonic() - self.wharehouse.started, 3), self.wharehouse.pack_path)
+
+    # constant time and without allocation: the board maintains the number of uncovered goals
+    def end_game(self):
+        return self.wharehouse.board.is_solved()
+
+    def xsb_char(self):
+        if self.under.is_free_place(): return '@'
+        else: return '+'
+
+    def is_free_place(self):
+        return False
+
+    # a single impossible push animation: a new one replaces the running one
+    def start_impossible_push_animation(self):
+        self.wharehouse.animate("impossiblePush", self.position, "red", "impossiblePush")
+        
+        
+            
+
+"""
+    The game with everything needed to draw and store/manage the matrix of elements.
+    
+"""
+class Level(object):
+    def __init__(self, root, xsb_matrix, level_num, pack_path=None, board=None):
+        self.root = root
+
+        # calculation of the matrix dimensions
+        nbrows = len(xsb_matrix)
+        nbcolumns = 0
+
+        for line in xsb_matrix:
+            nbc = len(line)
+            if nbc > nbcolumns:
+                nbcolumns = nbc
+
+        # the levels larger than the screen are scrolled
+        view = None
+        max_columns = max(1, self.root.winfo_screenwidth() // IMAGE_SIZE - WINDOW_MARGIN)
+        max_rows = max(1, self.root.winfo_screenheight() // IMAGE_SIZE - WINDOW_MARGIN)
+        if nbcolumns > max_columns or nbrows > max_rows:
+            nbcolumns = min(nbcolumns, max_columns)
+            nbrows = min(nbrows, max_rows)
+            view = (nbcolumns, nbrows)
+
+        self.canvas = tk.Canvas(self.root, width=IMAGE_SIZE * nbcolumns, height=IMAGE_SIZE * nbrows, bg="gray")
+
+        self.wharehouse = WharehousePlan.from_xsb_matrix(xsb_matrix,self.canvas,level_num,view=view,pack_path=pack_path,board=board)
+        
+        self.mover = self.wharehouse.get_mover()
+
+        # the key events are applied at once, the canvas is drawn once per frame
+        self.inputs = InputQueue()
+        self.applying = False
+        self.clock = FrameClock(self.canvas, self.render)
+
+        self.canvas.pack()
+        self.root.bind("<Key>", self.keypressed)
+        # both cases: with Caps Lock or Shift, the keysym is the upper case letter
+        for key in ("z", "Z"):
+            self.root.bind("<Control-" + key + ">", self.undo)
+        for key in ("y", "Y"):
+            self.root.bind("<Control-" + key + ">", self.redo)
+        self.root.geometry(str(IMAGE_SIZE * nbcolumns) + "x" + str(IMAGE_SIZE * nbrows))
+
+    # Only the arrow keys move the mover: any other key (Control of Ctrl-Z, ...) is ignored
+    def keypressed(self, event):
+        direction = ARROW_KEYS.get(event.keysym)
+        if direction is None:
+            return
+        self.inputs.push(direction)
+        self.apply_inputs()
+
+    def undo(self, event=None):
+        self.inputs.push(UNDO)
+        self.apply_inputs()
+
+    def redo(self, event=None):
+        self.inputs.push(REDO)
+        self.apply_inputs()
+
+    # Jumps to the state reached by the LURD string #lurd, drawn in one frame
+    def replay(self, lurd):
+        result = self.wharehouse.fast_forward(lurd)
+        self.clock.request()
+        if result.solved:
+            self.mover.win()
+        return result
+
+    # Scripted input: the moves #directions are played in order, then drawn in one frame
+    def feed(self, directions):
+        self.inputs.extend(directions)
+        self.apply_inputs()
+
+    # Applies the queued moves to the state of the game and asks for a frame.
+    # A key event received while a move is applied (e.g. during the dialog of the win)
+    # is only queued, and applied after it in order.
+    def apply_inputs(self):
+        if self.applying:
+            return
+        self.applying = True
+        try:
+            while self.inputs:
+                action = self.inputs.pop()
+                if action == UNDO:
+                    self.wharehouse.undo()
+                elif action == REDO:
+                    self.wharehouse.redo()
+                else:
+                    self.mover.move_towards(action)
+        finally:
+            self.applying = False
+        self.clock.request()
+
+    def render(self):
+        self.wharehouse.render()
+         
+"""
+Leaderboard: paginated window of the scores.
+    Only the page displayed is read from the score store (see scores.py): by highest level,
+    or on the level #level_num (of the pack #pack_path, None for the built-in levels)
+    by fewest moves, fewest pushes or best time.
+"""
+class Leaderboard(object):
+    RANKINGS = ("Highest level", "Fewest moves", "Fewest pushes", "Best time")
+
+    def __init__(self, root, level_num, pack_path=None):
+        self.level_num = level_num
+        self.pack_path = pack_path
+        self.page = 0
+        self.window = tk.Toplevel(root)
+        self.window.title("Scores")
+        self.ranking = tk.StringVar(self.window, self.RANKINGS[0])
+        tk.OptionMenu(self.window, self.ranking, *self.RANKINGS, command=self.change_ranking).pack(fill=tk.X)
+        self.title = tk.Label(self.window)
+        self.title.pack()
+        self.list = tk.Listbox(self.window, width=50, height=scores.PAGE_SIZE)
+        self.list.pack()
+        buttons = tk.Frame(self.window)
+        buttons.pack()
+        tk.Button(buttons, text="< Previous", command=self.previous_page).pack(side=tk.LEFT)
+        tk.Button(buttons, text="Next >", command=self.next_page).pack(side=tk.LEFT)
+        self.rows = []
+        self.show()
+
+    def change_ranking(self, value):
+        self.page = 0
+        self.show()
+
+    def previous_page(self):
+        if self.page > 0:
+            self.page -= 1
+            self.show()
+
+    def next_page(self):
+        # the last page is full: the next one may exist
+        if len(self.rows) == scores.PAGE_SIZE:
+            self.page += 1
+            self.show()
+
+    def show(self):
+        store = scores.default_store()
+        ranking = self.ranking.get()
+        first = self.page * scores.PAGE_SIZE + 1
+        self.list.delete(0, tk.END)
+        if ranking == "Highest level":
+            self.title.configure(text="Page " + str(self.page + 1))
+            self.rows = store.top_levels(self.page)
+            for rank, (username, level) in enumerate(self.rows, first):
+                self.list.insert(tk.END, str(rank) + ". " + str(username) + " : level " + str(level))
+            return
+        if ranking == "Fewest moves":
+            self.rows = store.top_moves(self.level_num, self.page, pack=self.pack_path)
+        elif ranking == "Fewest pushes":
+            self.rows = store.top_pushes(self.level_num, self.page, pack=self.pack_path)
+        else:
+            self.rows = store.top_times(self.level_num, self.page, pack=self.pack_path)
+        pack = "" if self.pack_path is None else os.path.basename(self.pack_path) + ", "
+        self.title.configure(text=pack + "Level " + str(self.level_num) + ", page " + str(self.page + 1))
+        for rank, (username, moves, pushes, seconds) in enumerate(self.rows, first):
+            self.list.insert(tk.END, str(rank) + ". " + str(username) + " : " + str(moves) + " moves, "
+                             + str(pushes) + " pushes, " + str(round(seconds, 1)) + " s")
+
+class Sokoban(object):
+    '''
+    Main Level class
+    '''
+    
+    def __init__(self):
+        self.root = tk.Tk()
+        #self.root.resizable(False, False)
+        self.root.title("Sokoban")
+        self.level = None
+        self.level_num = 0
+        # level pack played (see levels.py), None for the built-in levels
+        self.pack_path = None
+        self.table = tk.Frame(self.root)
+        self.table.pack()
+        self.table.grid(row=0, column=0)
+        # allows to fix the window size
+        self.root.geometry("500x300")
+        
+    # Display the scores page by page, the rankings by level are the ones of the current level
+    def score(self):
+        Leaderboard(self.root, self.level_num, self.pack_path)
+
+
+    def start(self):
+        self.play_level(self.level_num, self.pack_path)
+
+    # Levels of external packs may be broken: the level is parsed and validated once,
+    # the current level (and its number and pack) is only replaced by a valid one
+    def play_level(self, level_num, pack_path):
+        xsb_matrix = levels.load_level(level_num, pack_path)
+        try:
+            board = Board.from_xsb(xsb_matrix, validate=True)
+        except InvalidLevel as error:
+            messagebox.showinfo("Level", "The level " + str(level_num) + " cannot be played: " + str(error))
+            return
+        self.level_num = level_num
+        self.pack_path = pack_path
+        if self.table is not None:
+            self.table.destroy()
+            self.table = None
+        if self.level is not None:
+            # the canvas of the previous level and all its items are released
+            self.level.clock.cancel()
+            self.level.wharehouse.animations.cancel_all()
+            self.level.canvas.destroy()
+        self.level = Level(self.root, xsb_matrix, level_num, pack_path, board)
+        self.level.canvas.pack(),    
+
+    def undo(self):
+        if self.level is not None:
+            self.level.undo()
+
+    def redo(self):
+        if self.level is not None:
+            self.level.redo()
+
+    def replay(self):
+        if self.level is None:
+            return
+        lurd = tk.simpledialog.askstring("Replay", "Moves (LURD):")
+        if lurd:
+            result = self.level.replay(lurd)
+            if not result.valid:
+                messagebox.showinfo("Replay", "Replay stopped: " + result.error)
+
+    def choose_level(self):
+        last = levels.level_count(self.pack_path) - 1
+        level_num = tk.simpledialog.askinteger("Level", "Choose a level (0-" + str(last) + ")", minvalue=0, maxvalue=last)
+        if level_num is None:
+            return
+        self.play_level(level_num, self.pack_path)
+
+    # Plays the levels of a text or SLC pack: only the index of the pack is built, the levels are read when chosen
+    def open_pack(self):
+        path = tk.filedialog.askopenfilename(title="Open a level pack", filetypes=[("Level packs", "*.txt *.xsb *.sok *.slc *.xml"), ("All files", "*")])
+        if not path:
+            return
+        if levels.level_count(path) == 0:
+            messagebox.showinfo("Level pack", "No level found in " + path)
+            return
+        self.play_level(0, path)
+    
+    def menu(self):
+        self.root.config(menu=tk.Menu(self.root))
+        self.root.config(menu=tk.Menu(self.root))
+        menu = tk.Menu(self.root)
+        menu.add_command(label="Choose a level", command=self.choose_level)
+        menu.add_command(label="Open a level pack", command=self.open_pack)
+        menu.add_command(label="Restart", command=self.start)
+        menu.add_command(label="Undo", command=self.undo)
+        menu.add_command(label="Redo", command=self.redo)
+        menu.add_command(label="Replay moves", command=self.replay)
+        menu.add_command(label="Scores", command=self.score)
+        menu.add_command(label="Quit", command=self.root.destroy)
+        self.root.config(menu=menu)
+
+    def play(self):
+        self.root.mainloop()
+
+
+# Entry point of the game: importing this module has no side effect (no window, no level loaded)
+def main():
+    jeu = Sokoban()
+    jeu.menu()
+    jeu.play()
+
+
+if __name__ == "__main__":
+    main()
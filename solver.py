@@ -0,0 +1,376 @@
+"""
+Push-level solver for the Sokoban levels.
+
+The search does not work on single steps of the mover but on box pushes:
+a node is the set of the boxes plus the region reachable by the mover,
+the region being normalized as its smallest cell index. Two states which
+only differ by the place of the mover inside the same region are the same
+node. The walk of the mover between two pushes is rebuilt at the end to
+produce a LURD solution string.
+
+Two algorithms are available:
+    - "astar": A*, push-optimal, memory grows with the number of nodes
+    - "idastar": IDA*, push-optimal, memory bounded by the depth of the solution
+      and the size of its transposition table
+
+Usage:
+    python3 solver.py 3                     # level 3 of the built-in levels
+    python3 solver.py 3 --pack levels.txt   # 4th level of levels.txt
+"""
+import heapq
+import sys
+import time
+from collections import deque
+
+from board import Board, WALL, MOVE_CHARS, PUSH_CHARS, PUSHED
+import deadlock
+import distances
+from heuristic import AssignmentHeuristic, INFINITY
+import levels
+from zobrist import TranspositionTable
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows: no memory limit
+    resource = None
+
+
+
+class SearchLimitReached(Exception):
+    pass
+
+
+"""
+SearchResult: outcome of a search.
+    solution is the LURD string (None if the level was not solved),
+    status is "solved", "unsolvable", "nodes" (node limit), "time" (time limit)
+    or "memory" (memory limit).
+"""
+class SearchResult(object):
+    def __init__(self, status: str, solution: str, pushes: int, nodes: int, seconds: float) -> None:
+        self.status = status
+        self.solution = solution
+        self.pushes = pushes
+        self.nodes = nodes
+        self.seconds = seconds
+
+    @property
+    def solved(self) -> bool:
+        return self.status == "solved"
+
+    @property
+    def moves(self) -> int:
+        return len(self.solution) if self.solution is not None else 0
+
+    def __str__(self):
+        return 'SearchResult(' + self.status + ', pushes=' + str(self.pushes) + ', nodes=' + str(self.nodes) + ')'
+
+
+"""
+    Peak memory used by the process in bytes (None if it cannot be measured).
+"""
+def peak_memory():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+"""
+    Cells reachable by the mover from #start without pushing any box.
+    Returns the marks of the reachable cells and the smallest reachable index,
+    which identifies the region.
+"""
+def reachable(cells, offsets, boxes, start: int) -> tuple:
+    seen = bytearray(len(cells))
+    seen[start] = 1
+    stack = [start]
+    region = start
+    while stack:
+        index = stack.pop()
+        for offset in offsets:
+            neighbour = index + offset
+            if not seen[neighbour] and cells[neighbour] != WALL and neighbour not in boxes:
+                seen[neighbour] = 1
+                stack.append(neighbour)
+                if neighbour < region:
+                    region = neighbour
+    return seen, region
+
+
+"""
+    Shortest walk of the mover from #start to #target without pushing any box,
+    as a string of lower case LURD characters (None if #target is not reachable).
+"""
+def walk(cells, offsets, boxes, start: int, target: int):
+    if start == target:
+        return ""
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        index = queue.popleft()
+        for direction in range(4):
+            neighbour = index + offsets[direction]
+            if neighbour in previous or cells[neighbour] == WALL or neighbour in boxes:
+                continue
+            previous[neighbour] = (index, direction)
+            if neighbour == target:
+                path = []
+                while previous[neighbour] is not None:
+                    neighbour, direction = previous[neighbour]
+                    path.append(MOVE_CHARS[direction])
+                return "".join(reversed(path))
+            queue.append(neighbour)
+    return None
+
+
+"""
+Solver: push-level search on a Board.
+    The board is not modified, the search works on frozensets of box indices.
+"""
+class Solver(object):
+    def __init__(self, board: Board, max_nodes: int = None, time_limit: float = None, level_id=None,
+                 table_bytes: int = 32 * 1024 * 1024, max_memory: int = None) -> None:
+        # the time limit includes the precomputations (push distances of a large level: about a second)
+        self.start_time = time.perf_counter()
+        self.board = board
+        self.cells = board.cells
+        self.offsets = board.offsets
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.table_bytes = table_bytes
+        self.max_memory = max_memory
+        self.table = None
+        self.nodes = 0
+        self.deadline = None if time_limit is None else self.start_time + time_limit
+        self.level_id = level_id
+        # computed by prepare
+        self.dead_squares = None
+        self.distances = None
+        self.assignments = None
+
+    """
+        Precomputations of the level, within the time limit.
+    """
+    def prepare(self) -> None:
+        if self.assignments is not None:
+            return
+        self.dead_squares = deadlock.dead_squares(self.board, self.level_id)
+        self.distances = distances.push_distances(self.board, check=self.check_time)
+        # lower bound of the pushes left: minimum cost matching of the boxes to the goals
+        self.assignments = AssignmentHeuristic(self.distances)
+
+    def check_limits(self) -> None:
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchLimitReached("nodes")
+        # on every node: one expansion of a level with hundreds of boxes takes tens of milliseconds
+        self.check_time()
+        if self.max_memory is not None and (peak_memory() or 0) > self.max_memory:
+            raise SearchLimitReached("memory")
+
+    def check_time(self) -> None:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchLimitReached("time")
+
+    """
+        Generates the pushes available from the node (#boxes, mover at #player):
+        yields (box, direction, new_boxes, new_region).
+        Pushes on a dead square or freezing boxes off goals are never generated.
+    """
+    def successors(self, boxes, player: int):
+        cells = self.cells
+        offsets = self.offsets
+        dead_squares = self.dead_squares
+        seen, _ = reachable(cells, offsets, boxes, player)
+        for box in boxes:
+            # the pushes of a single node can outlast the time limit
+            self.check_time()
+            for direction in range(4):
+                offset = offsets[direction]
+                target = box + offset
+                if cells[target] == WALL or dead_squares[target] or target in boxes or not seen[box - offset]:
+                    continue
+                new_boxes = boxes - {box} | {target}
+                if deadlock.is_freeze_deadlock(self.board, target, dead_squares, new_boxes):
+                    continue
+                _, region = reachable(cells, offsets, new_boxes, box)
+                yield box, direction, new_boxes, region
+
+    def is_goal(self, boxes) -> bool:
+        return self.board.goals <= boxes
+
+    def solve(self, method: str = "astar") -> SearchResult:
+        start_time = self.start_time
+        self.nodes = 0
+        try:
+            self.prepare()
+            if method == "astar":
+                pushes = self.astar()
+            elif method == "idastar":
+                pushes = self.idastar()
+            else:
+                raise ValueError("unknown search method: " + method)
+        except SearchLimitReached as limit:
+            return SearchResult(str(limit), None, 0, self.nodes, time.perf_counter() - start_time)
+        seconds = time.perf_counter() - start_time
+        if pushes is None:
+            return SearchResult("unsolvable", None, 0, self.nodes, seconds)
+        return SearchResult("solved", self.to_lurd(pushes), len(pushes), self.nodes, seconds)
+
+    """
+        A* over the pushes. The nodes are identified by their Zobrist hash
+        (boxes and normalized mover), which keeps the tables small.
+    """
+    def astar(self):
+        keys = self.board.keys
+        box_keys = keys.boxes
+        start_boxes = frozenset(self.board.boxes)
+        start_box_hash = keys.boxes_hash(start_boxes)
+        _, start_region = reachable(self.cells, self.offsets, start_boxes, self.board.player)
+        start = start_box_hash ^ keys.players[start_region]
+        start_assignment = self.assignments.initial(start_boxes, self.check_time)
+        if start_assignment.value >= INFINITY:
+            return None
+        # parents[node] = (parent node, box pushed, direction), best[node] = pushes from the start
+        parents = {start: None}
+        best = {start: 0}
+        counter = 0
+        # on equal f, prefer the deepest node
+        heap = [(start_assignment.value, 0, counter, start, start_boxes, start_box_hash, start_assignment, self.board.player)]
+        while heap:
+            f, negative_g, _, node, boxes, box_hash, assignment, player = heapq.heappop(heap)
+            g = -negative_g
+            if g > best[node]:
+                continue
+            if self.is_goal(boxes):
+                return self.pushes_to(node, parents)
+            self.check_limits()
+            for box, direction, new_boxes, region in self.successors(boxes, player):
+                target = box + self.offsets[direction]
+                child_box_hash = box_hash ^ box_keys[box] ^ box_keys[target]
+                child = child_box_hash ^ keys.players[region]
+                child_g = g + 1
+                if child in best and best[child] <= child_g:
+                    continue
+                child_assignment = self.assignments.moved(assignment, box, target)
+                if child_assignment.value >= INFINITY:
+                    continue
+                best[child] = child_g
+                parents[child] = (node, box, direction)
+                counter += 1
+                heapq.heappush(heap, (child_g + child_assignment.value, -child_g, counter, child, new_boxes, child_box_hash,
+                                      child_assignment, box))
+        return None
+
+    """
+        IDA* over the pushes. The transpositions are detected with a bounded
+        table (#table_bytes), the memory of the search does not depend on the
+        number of nodes.
+    """
+    def idastar(self):
+        start_boxes = frozenset(self.board.boxes)
+        start_assignment = self.assignments.initial(start_boxes, self.check_time)
+        bound = start_assignment.value
+        if bound >= INFINITY:
+            return None
+        # table[node] = fewest pushes found to reach node during the iteration,
+        # the entries with the largest remaining depth are preferred
+        self.table = TranspositionTable(self.table_bytes, "depth")
+        path = []
+        while True:
+            self.table.clear()
+            minimum = self.bounded_search(start_boxes, self.board.keys.boxes_hash(start_boxes), start_assignment,
+                                          self.board.player, 0, bound, path)
+            if minimum is True:
+                return path
+            if minimum >= INFINITY:
+                return None
+            bound = minimum
+
+    def bounded_search(self, boxes, box_hash, assignment, player, g, bound, path):
+        f = g + assignment.value
+        if f > bound:
+            return f
+        if self.is_goal(boxes):
+            return True
+        keys = self.board.keys
+        _, region = reachable(self.cells, self.offsets, boxes, player)
+        node = box_hash ^ keys.players[region]
+        previous_g = self.table.lookup(node)
+        if previous_g is not None and previous_g <= g:
+            return INFINITY
+        self.table.store(node, g, bound - g)
+        self.check_limits()
+        minimum = INFINITY
+        for box, direction, new_boxes, _ in self.successors(boxes, player):
+            target = box + self.offsets[direction]
+            child_box_hash = box_hash ^ keys.boxes[box] ^ keys.boxes[target]
+            child_assignment = self.assignments.moved(assignment, box, target)
+            path.append((box, direction))
+            result = self.bounded_search(new_boxes, child_box_hash, child_assignment, box, g + 1, bound, path)
+            if result is True:
+                return True
+            path.pop()
+            if result < minimum:
+                minimum = result
+        return minimum
+
+    def pushes_to(self, node, parents) -> list:
+        pushes = []
+        while parents[node] is not None:
+            node, box, direction = parents[node]
+            pushes.append((box, direction))
+        pushes.reverse()
+        return pushes
+
+    """
+        Converts the list of (box, direction) pushes to a LURD string by walking
+        the mover behind each box before pushing it.
+    """
+    def to_lurd(self, pushes) -> str:
+        board = self.board.copy()
+        moves = []
+        for box, direction in pushes:
+            moves.append(walk(board.cells, board.offsets, board.boxes, board.player, box - board.offsets[direction]))
+            moves.append(PUSH_CHARS[direction])
+            board.player = box - board.offsets[direction]
+            if board.move(direction) != PUSHED:
+                raise RuntimeError("invalid push in the solution")
+        return "".join(moves)
+
+
+def solve_board(board: Board, method: str = "astar", max_nodes: int = None, time_limit: float = None, level_id=None,
+                max_memory: int = None) -> SearchResult:
+    return Solver(board, max_nodes, time_limit, level_id, max_memory=max_memory).solve(method)
+
+
+"""
+    Returns the LURD solution of the level #index (see levels.load_level),
+    or None if no solution was found within the limits.
+"""
+def solve_level(index: int, path: str = None, method: str = "astar", max_nodes: int = None, time_limit: float = None):
+    board = Board.from_xsb(levels.load_level(index, path))
+    return solve_board(board, method, max_nodes, time_limit, (path, index)).solution
+
+
+def main(argv=None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Solve a Sokoban level.")
+    parser.add_argument("level", type=int, help="index of the level in the pack")
+    parser.add_argument("--pack", help="text pack (default: the built-in levels)")
+    parser.add_argument("--method", choices=("astar", "idastar"), default="astar")
+    parser.add_argument("--max-nodes", type=int)
+    parser.add_argument("--time-limit", type=float, help="seconds")
+    args = parser.parse_args(argv)
+    board = Board.from_xsb(levels.load_level(args.level, args.pack))
+    result = solve_board(board, args.method, args.max_nodes, args.time_limit)
+    print(result)
+    if result.solved:
+        print(result.solution)
+
+
+if __name__ == "__main__":
+    main()
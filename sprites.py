@@ -0,0 +1,84 @@
+"""
+Process-wide cache of the sprites of the game.
+
+Every PNG of the assets directory is decoded once, then scaled once per tile
+size: all the entities drawn with the same sprite share the same tk.PhotoImage.
+The cost of loading a level or of a keypress does not depend anymore on the
+number of tiles.
+
+The static layer of a level (walls and goals, the floor being the background
+of the canvas) can also be composed into a single image (static_layer), drawn
+as one canvas item instead of one item per tile.
+
+A Tk root window must exist before the first call (tk.PhotoImage needs it).
+"""
+import os
+import tkinter as tk
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# decoded PNGs, by name
+_decoded = {}
+# sprites by (name, tile size)
+_sprites = {}
+# last static layer composed: (key, image), reused when the same level is restarted
+_static_layer = (None, None)
+
+
+def _decode(name: str) -> tk.PhotoImage:
+    image = _decoded.get(name)
+    if image is None:
+        image = tk.PhotoImage(file=os.path.join(ASSETS_DIR, name + ".png"))
+        _decoded[name] = image
+    return image
+
+
+"""
+    Returns the sprite #name (file assets/#name.png) scaled to #size x #size pixels.
+"""
+def get(name: str, size: int) -> tk.PhotoImage:
+    key = (name, size)
+    image = _sprites.get(key)
+    if image is None:
+        image = _decode(name)
+        native = image.width()
+        if size != native:
+            if size % native == 0:
+                image = image.zoom(size // native)
+            elif native % size == 0:
+                image = image.subsample(native // size)
+            else:
+                image = image.zoom(size).subsample(native)
+        _sprites[key] = image
+    return image
+
+
+"""
+    Returns the image of the walls and goals of a level of #columns x #rows tiles
+    of #size pixels, #walls and #goals being lists of (x, y) tiles.
+    The floor is left transparent. The image is composed once and reused as
+    long as the same layout is asked.
+"""
+def static_layer(columns: int, rows: int, walls: list, goals: list, size: int) -> tk.PhotoImage:
+    global _static_layer
+    key = (columns, rows, tuple(walls), tuple(goals), size)
+    if _static_layer[0] == key:
+        return _static_layer[1]
+    image = tk.PhotoImage(width=columns * size, height=rows * size)
+    for sprite, tiles in ((get("wall", size), walls), (get("goal", size), goals)):
+        for x, y in tiles:
+            # Tk photo copy of a whole tile at its place in the layer
+            image.tk.call(image, "copy", sprite, "-to", x * size, y * size)
+    _static_layer = (key, image)
+    return image
+
+
+def clear() -> None:
+    global _static_layer
+    _sprites.clear()
+    _decoded.clear()
+    _static_layer = (None, None)
+
+
+def cached_count() -> int:
+    return len(_sprites)
@@ -0,0 +1,64 @@
+"""
+Regression checks of the push distances (python3 -m pytest tests).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board import Board
+import distances
+import heuristic
+import levels
+import solver
+
+
+"""
+    Level 44 holds two boxes on goals walled in on all four sides: they are at
+    distance 0 of their goal, and the level is not reported unsolvable.
+"""
+def test_walled_in_goals():
+    board = Board.from_xsb(levels.builtin_level(44))
+    table = distances.compute_push_distances(board)
+    for number, goal in enumerate(table.goals):
+        assert table.distance(goal, number) == 0
+    walled_in = [board.index(5, 4), board.index(5, 8)]
+    assert all(box in board.goals and box in board.boxes for box in walled_in)
+    assignment = heuristic.AssignmentHeuristic(table).initial(board.boxes)
+    assert assignment.value < heuristic.INFINITY
+    result = solver.solve_board(board, max_nodes=200000, time_limit=60)
+    assert result.status != "unsolvable"
+    assert result.solved
+
+
+"""
+    The table cached on the disk (u16) is read back identical, and a file of
+    another version is ignored.
+"""
+def test_cache_round_trip(tmp_path):
+    board = Board.from_xsb(levels.builtin_level(3))
+    computed = distances.compute_push_distances(board)
+    path = distances.cache_path(distances.layout_key(board), str(tmp_path))
+    distances.save_push_distances(computed, path)
+    loaded = distances.open_push_distances(path)
+    assert loaded.goals == computed.goals
+    assert loaded.size == computed.size
+    assert list(loaded.table) == list(computed.table)
+    assert distances.UNREACHABLE in list(loaded.table)
+    loaded.table.release()
+    loaded.mapping.close()
+    with open(path, "r+b") as f:
+        f.seek(4)
+        f.write(bytes([distances.VERSION + 1, 0]))
+    assert distances.open_push_distances(path) is None
+    assert distances.open_push_distances(str(tmp_path / "missing.bin")) is None
+
+
+def test_push_distances_uses_the_cache(tmp_path):
+    board = Board.from_xsb(levels.builtin_level(5))
+    distances._loaded.clear()
+    first = distances.push_distances(board, str(tmp_path))
+    distances._loaded.clear()
+    second = distances.push_distances(board, str(tmp_path))
+    assert second.mapping is not None
+    assert list(second.table) == list(first.table)
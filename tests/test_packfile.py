@@ -0,0 +1,73 @@
+"""
+Regression checks of the binary level packs (python3 -m pytest tests).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import levels
+import packfile
+
+PACK = """Level 1
+#####
+#@$.#
+#####
+
+Niveau é
+  #####
+###   #
+#.@$  #
+####  #
+   ####
+"""
+
+
+def write_source(tmp_path, text=PACK):
+    path = tmp_path / "pack.txt"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+"""
+    The levels read back from the .sklp file are the levels of the source,
+    short rows included, whether the levels are given as a list or as a stream.
+"""
+def test_round_trip(tmp_path):
+    source = write_source(tmp_path)
+    with levels.LevelPack(source) as pack:
+        entries = [pack.entry(index) for index in range(len(pack))]
+    count, stream = packfile.read_source(source)
+    packfile.write_pack(stream, str(tmp_path / "streamed.sklp"), count=count)
+    packfile.write_pack(entries, str(tmp_path / "listed.sklp"))
+    for name in ("streamed.sklp", "listed.sklp"):
+        binary = packfile.BinaryPack(str(tmp_path / name))
+        assert len(binary) == 2
+        assert [binary.entry(index) for index in range(2)] == entries
+        assert binary.title(1) == "Niveau é"
+        binary.close()
+
+
+"""
+    The cache is reused while the source is unchanged (even touched), rebuilt
+    when it changes; a pack still held by a caller stays readable.
+"""
+def test_freshness(tmp_path):
+    source = write_source(tmp_path)
+    first = packfile.cached_pack(source)
+    assert os.path.exists(source + packfile.CACHE_EXTENSION)
+    assert packfile.cached_pack(source) is first
+    status = os.stat(source)
+    os.utime(source, ns=(status.st_atime_ns, status.st_mtime_ns + 10 ** 9))
+    assert packfile.cached_pack(source) is first
+    write_source(tmp_path, PACK + "\nLevel 3\n#####\n#@$.#\n#####\n")
+    second = packfile.cached_pack(source)
+    assert second is not first
+    assert len(second) == 3
+    assert len(first) == 2 and first[0] == ["#####", "#@$.#", "#####"]
+
+
+def test_not_a_pack(tmp_path):
+    path = tmp_path / "broken.sklp"
+    path.write_bytes(b"XXXX" + bytes(packfile.HEADER.size))
+    assert packfile.open_cached(str(path)) is None
@@ -0,0 +1,59 @@
+"""
+Regression checks of the headless replay of LURD strings (python3 -m pytest tests).
+"""
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from board import Board
+import replay
+
+LEVEL = ["#######",
+         "#@ $ .#",
+         "#######"]
+
+
+def test_expand():
+    assert replay.expand("3r2L u") == "rrrLLu"
+    with pytest.raises(ValueError):
+        replay.expand("2r x")
+    assert replay.replay(Board.from_xsb(LEVEL), "rx").error == "invalid character 'x' at move 2"
+
+
+def test_solved():
+    result = replay.replay(Board.from_xsb(LEVEL), "rRR")
+    assert result.valid and result.solved
+    assert (result.moves, result.pushes) == (3, 2)
+
+
+"""
+    Without #strict the case of the moves is ignored, with #strict a push
+    written as a move (or a move written as a push) stops the replay.
+"""
+def test_strict():
+    assert replay.replay(Board.from_xsb(LEVEL), "rrr").solved
+    result = replay.replay(Board.from_xsb(LEVEL), "rrr", strict=True)
+    assert not result.valid
+    assert result.error == "unexpected push at move 2"
+    result = replay.replay(Board.from_xsb(LEVEL), "R", strict=True)
+    assert result.error == "no box pushed at move 1"
+
+
+def test_blocked():
+    result = replay.replay(Board.from_xsb(LEVEL), "l")
+    assert not result.valid
+    assert result.error == "blocked at move 1"
+
+
+"""
+    A title made of digits (SLC Id) starts a new solution.
+"""
+def test_read_solutions():
+    text = "Level 1\nrR\n3R\n\n12\nuL\n\n7\n"
+    assert list(replay.read_solutions(io.StringIO(text))) == [("Level 1", "rR3R"), ("12", "uL")]
+    assert replay.level_number("Level 12") == 12
+    assert replay.level_number("12") is None
@@ -0,0 +1,93 @@
+"""
+Regression checks of the SQLite score store (python3 -m pytest tests).
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scores
+
+
+"""
+    The scores of score.json are imported once: the best level is kept, and
+    the file is not imported again by the next stores.
+"""
+def test_migrate_json(tmp_path):
+    json_path = tmp_path / "score.json"
+    json_path.write_text(json.dumps({"ann": 4, "bob": 2, "null": 7}))
+    store = scores.ScoreStore(str(tmp_path / "scores.db"), str(json_path))
+    store.record_win("bob", 6, 10, 2, 1.0)
+    assert store.players() == [("ann", 4), ("bob", 6)]
+    store.close()
+    json_path.write_text(json.dumps({"ann": 9, "carl": 1}))
+    store = scores.ScoreStore(str(tmp_path / "scores.db"), str(json_path))
+    assert store.players() == [("ann", 4), ("bob", 6)]
+    assert store.migrate_json(str(json_path)) == 0
+    store.close()
+
+
+def test_missing_json(tmp_path):
+    store = scores.ScoreStore(str(tmp_path / "scores.db"), str(tmp_path / "score.json"))
+    assert store.players() == []
+    store.close()
+
+
+"""
+    Every record of a ranking is one whole win, replaced only by a better one.
+"""
+def test_records_keep_whole_wins(tmp_path):
+    store = scores.ScoreStore(str(tmp_path / "scores.db"))
+    store.record_win("ann", 3, 50, 4, 2.5)
+    store.record_win("ann", 3, 40, 6, 3.0)
+    store.record_win("ann", 3, 40, 7, 1.0)
+    store.record_win("bob", 3, 45, 4, 2.0)
+    assert store.top_moves(3) == [("ann", 40, 6, 3.0), ("bob", 45, 4, 2.0)]
+    # same pushes: fewest moves first
+    assert store.top_pushes(3) == [("bob", 45, 4, 2.0), ("ann", 50, 4, 2.5)]
+    assert store.top_times(3) == [("ann", 40, 7, 1.0), ("bob", 45, 4, 2.0)]
+    assert store.top_moves(3, page=1, page_size=1) == [("bob", 45, 4, 2.0)]
+    store.close()
+
+
+"""
+    The wins of a pack have their own records and do not change the best level.
+"""
+def test_pack_wins(tmp_path):
+    store = scores.ScoreStore(str(tmp_path / "scores.db"))
+    store.record_win("ann", 2, 30, 3, 1.0)
+    assert store.record_win("ann", 9, 10, 1, 1.0, pack="/packs/a.txt") == 2
+    assert store.top_moves(9) == []
+    assert store.top_moves(9, pack="/packs/a.txt") == [("ann", 10, 1, 1.0)]
+    store.close()
+
+
+"""
+    A database of the first schema (records without ranking nor pack) is
+    upgraded: its records are rebuilt from its wins.
+"""
+def test_upgrade(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "scores.db")
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE players (username TEXT PRIMARY KEY, level INTEGER NOT NULL);
+        CREATE TABLE migrations (name TEXT PRIMARY KEY);
+        CREATE TABLE wins (id INTEGER PRIMARY KEY, username TEXT NOT NULL, level INTEGER NOT NULL,
+                           moves INTEGER NOT NULL, pushes INTEGER NOT NULL, seconds REAL NOT NULL, won_at REAL NOT NULL);
+        CREATE TABLE records (level INTEGER NOT NULL, username TEXT NOT NULL, moves INTEGER NOT NULL,
+                              pushes INTEGER NOT NULL, seconds REAL NOT NULL, PRIMARY KEY (level, username));
+        INSERT INTO players VALUES ('ann', 3);
+        INSERT INTO wins VALUES (1, 'ann', 3, 50, 4, 2.5, 0), (2, 'ann', 3, 40, 6, 3.0, 0);
+        INSERT INTO records VALUES (3, 'ann', 40, 4, 2.5);
+    """)
+    connection.close()
+    store = scores.ScoreStore(path)
+    assert store.connection.execute("PRAGMA user_version").fetchone()[0] == scores.SCHEMA_VERSION
+    assert store.players() == [("ann", 3)]
+    assert store.top_moves(3) == [("ann", 40, 6, 3.0)]
+    assert store.top_pushes(3) == [("ann", 50, 4, 2.5)]
+    store.record_win("ann", 3, 35, 9, 9.0)
+    assert store.top_moves(3) == [("ann", 35, 9, 9.0)]
+    store.close()
@@ -0,0 +1,119 @@
+"""
+Batch verification of solution files, distributed over the CPU cores.
+
+The solutions file (format of replay.py: a title line followed by the LURD lines)
+is read as a stream and sent to the worker processes by chunks, with a bounded
+number of chunks in flight: the memory used does not depend on the size of the
+file. Every worker opens the level pack once (its binary cache, memory mapped,
+see packfile.py) and only reads the levels of the solutions of its chunks. One JSON line is written per solution, in the order of the file:
+    {"level": "Level 3", "index": 2, "valid": true, "moves": 202, "pushes": 39, "error": null}
+"valid" is true if the moves are possible and solve the level.
+
+Usage:
+    python3 verify.py solutions.txt                       # levels of levels.txt, matched by title
+    python3 verify.py solutions.txt --builtin             # built-in levels ("Level N")
+    python3 verify.py solutions.txt --workers 4 --output results.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from board import Board
+import levels
+import replay
+
+CHUNK_SIZE = 256
+# chunks submitted per worker and not yet written
+CHUNKS_PER_WORKER = 4
+
+# levels of the worker process: the pack, and index by title (None for the built-in levels)
+_pack_levels = None
+_by_title = None
+
+
+"""
+    Initializer of the worker processes: opens the levels once per process, only
+    the titles of the pack are read.
+"""
+def init_worker(pack: str) -> None:
+    global _pack_levels, _by_title
+    if pack is None:
+        _pack_levels = levels.builtin_levels()
+        _by_title = None
+    else:
+        _pack_levels = levels.open_pack(pack)
+        _by_title = {_pack_levels.title(index): index for index in range(len(_pack_levels))}
+
+
+def verify_solution(title: str, lurd: str, strict: bool = False) -> dict:
+    index = _by_title.get(title) if _by_title is not None else replay.level_number(title)
+    if index is None or not 0 <= index < len(_pack_levels):
+        return {"level": title, "index": None, "valid": False, "moves": 0, "pushes": 0, "error": "unknown level"}
+    result = replay.replay(Board.from_xsb(_pack_levels[index]), lurd, strict)
+    error = result.error
+    if error is None and not result.solved:
+        error = "not solved"
+    return {"level": title, "index": index, "valid": result.solved, "moves": result.moves, "pushes": result.pushes,
+            "error": error}
+
+
+def verify_chunk(chunk: list, strict: bool) -> list:
+    return [verify_solution(title, lurd, strict) for title, lurd in chunk]
+
+
+"""
+    Verifies the (title, lurd) solutions of #solutions (any iterable, consumed
+    lazily) and writes their result lines in #output. Returns the number of
+    solutions and of valid ones.
+"""
+def run(solutions, output, pack: str = None, workers: int = None, strict: bool = False,
+        chunk_size: int = CHUNK_SIZE) -> dict:
+    summary = {"solutions": 0, "valid": 0}
+    workers = workers or os.cpu_count() or 1
+    solutions = iter(solutions)
+    pending = deque()
+    if pack is not None:
+        # the binary cache is built here once, not by every worker
+        levels.open_pack(pack)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(pack,)) as executor:
+        while True:
+            while len(pending) < workers * CHUNKS_PER_WORKER:
+                chunk = list(islice(solutions, chunk_size))
+                if not chunk:
+                    break
+                pending.append(executor.submit(verify_chunk, chunk, strict))
+            if not pending:
+                break
+            for result in pending.popleft().result():
+                summary["solutions"] += 1
+                summary["valid"] += result["valid"]
+                output.write(json.dumps(result) + "\n")
+    return summary
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Verify LURD solutions in parallel, one JSON line per solution.")
+    parser.add_argument("solutions", help="solutions file (title lines followed by LURD lines)")
+    parser.add_argument("--pack", default=levels.LEVELS_FILE, help="text pack of the levels, matched by title (default: levels.txt)")
+    parser.add_argument("--builtin", action="store_true", help="verify against the built-in levels (\"Level N\")")
+    parser.add_argument("--strict", action="store_true", help="the case of every move must match (push or not)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--output", help="JSONL file (default: standard output)")
+    args = parser.parse_args(argv)
+    pack = None if args.builtin else args.pack
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        with open(args.solutions, "r") as f:
+            summary = run(replay.read_solutions(f), output, pack, args.workers, args.strict)
+    finally:
+        if args.output:
+            output.close()
+    print("valid " + str(summary["valid"]) + "/" + str(summary["solutions"]), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
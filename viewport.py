@@ -0,0 +1,94 @@
+"""
+Viewport of the levels larger than the window.
+
+The canvas only shows #columns x #rows tiles of the level and scrolls to follow
+the mover. The static tiles (walls and goals) are drawn by a fixed pool of
+canvas items, one per visible tile: the item of the visible tile (x, y) is the
+slot (x mod columns, y mod rows), so when the view scrolls by one column only the
+items of the column entering the view are moved and changed, the other ones
+stay in place. The number of items and the drawing cost depend on the size of
+the window, not on the size of the level.
+
+The items keep the coordinates of the level (tile * size pixels), the canvas is
+scrolled with xview/yview: the entities are drawn as in a level fitting the window.
+"""
+import tkinter as tk
+
+import sprites
+
+
+class Viewport(object):
+    def __init__(self, canvas: tk.Canvas, level_columns: int, level_rows: int, walls: set, goals: set,
+                 columns: int, rows: int, size: int, margin: int = 2) -> None:
+        self.canvas = canvas
+        self.level_columns = level_columns
+        self.level_rows = level_rows
+        # (x, y) tiles of the walls and of the goals
+        self.walls = walls
+        self.goals = goals
+        self.columns = min(columns, level_columns)
+        self.rows = min(rows, level_rows)
+        self.size = size
+        # the mover is kept at least #margin tiles away from the edges of the view
+        self.margin = min(margin, (self.columns - 1) // 2, (self.rows - 1) // 2)
+        self.origin_x = 0
+        self.origin_y = 0
+        self.canvas.configure(scrollregion=(0, 0, level_columns * size, level_rows * size))
+        self.slots = [canvas.create_image(0, 0, anchor=tk.NW, state="hidden", tag="static")
+                      for _ in range(self.columns * self.rows)]
+        # tile currently drawn by each slot
+        self.slot_tiles = [None] * len(self.slots)
+        self.draw_tiles()
+
+    def is_visible(self, x: int, y: int) -> bool:
+        return self.origin_x <= x < self.origin_x + self.columns and self.origin_y <= y < self.origin_y + self.rows
+
+    """
+        Scrolls the view, if needed, to keep the tile (#x, #y) away from its edges.
+        Returns True if the view has scrolled.
+    """
+    def follow(self, x: int, y: int) -> bool:
+        origin_x = self.follow_axis(x, self.origin_x, self.columns, self.level_columns)
+        origin_y = self.follow_axis(y, self.origin_y, self.rows, self.level_rows)
+        if origin_x == self.origin_x and origin_y == self.origin_y:
+            return False
+        self.scroll_to(origin_x, origin_y)
+        return True
+
+    def follow_axis(self, position: int, origin: int, visible: int, total: int) -> int:
+        if position < origin + self.margin:
+            origin = position - self.margin
+        elif position >= origin + visible - self.margin:
+            origin = position - visible + self.margin + 1
+        return max(0, min(origin, total - visible))
+
+    def scroll_to(self, origin_x: int, origin_y: int) -> None:
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        self.canvas.xview_moveto(origin_x / self.level_columns)
+        self.canvas.yview_moveto(origin_y / self.level_rows)
+        self.draw_tiles()
+
+    """
+        Moves and changes the items of the slots whose tile is not visible anymore.
+    """
+    def draw_tiles(self) -> None:
+        canvas = self.canvas
+        wall = sprites.get("wall", self.size)
+        goal = sprites.get("goal", self.size)
+        for y in range(self.origin_y, self.origin_y + self.rows):
+            for x in range(self.origin_x, self.origin_x + self.columns):
+                slot = (y % self.rows) * self.columns + x % self.columns
+                tile = (x, y)
+                if self.slot_tiles[slot] == tile:
+                    continue
+                self.slot_tiles[slot] = tile
+                item = self.slots[slot]
+                if tile in self.walls:
+                    canvas.itemconfigure(item, image=wall, state="normal")
+                elif tile in self.goals:
+                    canvas.itemconfigure(item, image=goal, state="normal")
+                else:
+                    canvas.itemconfigure(item, state="hidden")
+                    continue
+                canvas.coords(item, x * self.size, y * self.size)
@@ -0,0 +1,161 @@
+"""
+State identity for the Sokoban boards.
+
+Zobrist hashing:
+    Every cell has a random 64-bit key for "a box is here" and another one for
+    "the mover is here". The hash of a state is the XOR of the keys of its boxes
+    and of its mover, so moving a box or the mover updates it in O(1)
+    (XOR out the old cell, XOR in the new one). The keys are generated from a
+    fixed seed: the hashes of a state are the same in every process.
+
+Transposition table:
+    Bounded table of (hash -> value, depth) with hit/miss counters. Its memory is
+    allocated once from #max_bytes and never grows, a full table replaces entries
+    according to its policy:
+        - "depth": two entries per bucket, the first one keeps the deepest
+          search result, the second one is always replaced
+        - "lru": the least recently used entry is replaced
+"""
+import random
+from array import array
+from collections import OrderedDict
+
+SEED = 0x50C0BA4
+MASK64 = (1 << 64) - 1
+
+
+class ZobristKeys(object):
+    def __init__(self, size: int, seed: int = SEED) -> None:
+        rng = random.Random(seed)
+        self.boxes: list = [rng.getrandbits(64) for _ in range(size)]
+        self.players: list = [rng.getrandbits(64) for _ in range(size)]
+
+    def boxes_hash(self, boxes) -> int:
+        h = 0
+        for box in boxes:
+            h ^= self.boxes[box]
+        return h
+
+
+# keys already generated, by number of cells
+_keys_cache = {}
+
+
+"""
+    Returns the Zobrist keys of the boards of #size cells (generated once per size).
+"""
+def keys_for(size: int) -> ZobristKeys:
+    keys = _keys_cache.get(size)
+    if keys is None:
+        keys = ZobristKeys(size)
+        _keys_cache[size] = keys
+    return keys
+
+
+class TranspositionTable(object):
+    # bytes per entry of the "depth" policy: key (8) + value (8) + depth (4)
+    ENTRY_BYTES = 20
+    # estimated bytes per entry of the "lru" policy (OrderedDict entry, int objects)
+    LRU_ENTRY_BYTES = 160
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, policy: str = "depth") -> None:
+        if policy not in ("depth", "lru"):
+            raise ValueError("unknown replacement policy: " + policy)
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.replacements = 0
+        if policy == "depth":
+            # number of buckets: largest power of 2 fitting in max_bytes
+            buckets = 1
+            while buckets * 4 * self.ENTRY_BYTES <= max_bytes:
+                buckets *= 2
+            self.mask = buckets - 1
+            self.capacity = buckets * 2
+            # a key of 0 marks an empty entry
+            self.keys = array('Q', bytes(8 * self.capacity))
+            self.values = array('q', bytes(8 * self.capacity))
+            self.depths = array('i', bytes(4 * self.capacity))
+            self.count = 0
+        else:
+            self.capacity = max(1, max_bytes // self.LRU_ENTRY_BYTES)
+            self.entries = OrderedDict()
+
+    def __len__(self) -> int:
+        if self.policy == "depth":
+            return self.count
+        return len(self.entries)
+
+    """
+        Returns the value stored for #key, None if it is not in the table.
+    """
+    def lookup(self, key: int):
+        if self.policy == "lru":
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        key = (key & MASK64) or 1
+        slot = (key & self.mask) << 1
+        if self.keys[slot] == key:
+            self.hits += 1
+            return self.values[slot]
+        if self.keys[slot + 1] == key:
+            self.hits += 1
+            return self.values[slot + 1]
+        self.misses += 1
+        return None
+
+    """
+        Stores #value for #key, #depth being the importance of the entry
+        (e.g. the depth of the search below this state).
+    """
+    def store(self, key: int, value: int, depth: int = 0) -> None:
+        self.stores += 1
+        if self.policy == "lru":
+            entries = self.entries
+            if key in entries:
+                entries.move_to_end(key)
+            elif len(entries) >= self.capacity:
+                entries.popitem(last=False)
+                self.replacements += 1
+            entries[key] = (value, depth)
+            return
+        key = (key & MASK64) or 1
+        slot = (key & self.mask) << 1
+        keys = self.keys
+        if keys[slot] == key or keys[slot] == 0 or depth >= self.depths[slot]:
+            # depth-preferred entry: the previous one is moved to the always-replace entry
+            if keys[slot] != key and keys[slot] != 0:
+                self._set(slot + 1, keys[slot], self.values[slot], self.depths[slot])
+            elif keys[slot + 1] == key:
+                keys[slot + 1] = 0
+                self.count -= 1
+        else:
+            slot += 1
+        self._set(slot, key, value, depth)
+
+    def _set(self, slot: int, key: int, value: int, depth: int) -> None:
+        previous = self.keys[slot]
+        if previous == 0:
+            self.count += 1
+        elif previous != key:
+            self.replacements += 1
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.depths[slot] = depth
+
+    def clear(self) -> None:
+        if self.policy == "lru":
+            self.entries.clear()
+        else:
+            self.keys = array('Q', bytes(8 * self.capacity))
+            self.count = 0
+
+    def stats(self) -> dict:
+        return {"entries": len(self), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "stores": self.stores, "replacements": self.replacements}